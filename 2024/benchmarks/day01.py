@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+"""
+Day 1 benchmarks on generated location lists, run from the 2024 directory:
+
+    python -m benchmarks.day01 columns --lines 1000000 10000000 100000000
+    python -m benchmarks.day01 incremental --lines 1000000 --appends 10000
+    python -m benchmarks.day01 external --lines 10000000 --run-bytes 16777216
+"""
+import argparse
+import importlib
+import multiprocessing
+import random
+import resource
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from benchmarks.grid import report, timed
+
+shared = importlib.import_module("day.01.shared")
+
+# Lines are generated this many at a time
+GENERATED_CHUNK = 1_000_000
+
+
+def write_locations(path: Path, lines: int, seed: int = 2024):
+    """Two columns of five digit locations, separated by three spaces like the puzzle input"""
+    generator = random.Random(seed)
+    with path.open("w") as open_file:
+        for start in range(0, lines, GENERATED_CHUNK):
+            count = min(GENERATED_CHUNK, lines - start)
+            values = [generator.randrange(10_000, 100_000) for _ in range(2 * count)]
+            open_file.write("".join(f"{left}   {right}\n" for left, right in zip(values[0::2], values[1::2])))
+
+
+def line_by_line(path: Path) -> tuple[int, int]:
+    """The original solution, one int() per value into lists, sorted zip and a defaultdict counter"""
+    left_column, right_column = [], []
+    with open(path) as open_file:
+        for line in open_file:
+            left, right = line.split()
+            left_column.append(int(left))
+            right_column.append(int(right))
+    distance = sum(abs(first - second) for first, second in zip(sorted(left_column), sorted(right_column)))
+    right_column_count = defaultdict(int)
+    for right in right_column:
+        right_column_count[right] += 1
+    return distance, sum(left * right_column_count[left] for left in left_column)
+
+
+def columns(args):
+    with tempfile.TemporaryDirectory() as directory:
+        for lines in args.lines:
+            path = Path(directory) / f"{lines}.txt"
+            seconds, _ = timed(write_locations, path, lines)
+            report(f"generate {lines} lines", seconds)
+            seconds, (left_column, right_column) = timed(shared.columns, path)
+            report(f"columns {lines} lines", seconds, type(left_column).__name__)
+            seconds, distance = timed(shared.total_distance, left_column, right_column)
+            report(f"total_distance {lines} lines", seconds, f"distance={distance}")
+            seconds, score = timed(shared.similarity, left_column, right_column)
+            report(f"similarity {lines} lines", seconds, f"similarity={score}")
+            del left_column, right_column
+            if lines <= args.baseline_limit:
+                seconds, answers = timed(line_by_line, path)
+                report(f"line by line {lines} lines", seconds, f"answers={answers}")
+            path.unlink()
+
+
+def incremental(args):
+    """Appending pairs one at a time to a LocationIndex against solving the whole lists again"""
+    generator = random.Random(2024)
+    appends = [(generator.randrange(10_000, 100_000), generator.randrange(10_000, 100_000)) for _ in range(args.appends)]
+    with tempfile.TemporaryDirectory() as directory:
+        for lines in args.lines:
+            path = Path(directory) / f"{lines}.txt"
+            write_locations(path, lines)
+            left_column, right_column = shared.columns(path)
+            seconds, index = timed(shared.LocationIndex.from_columns, left_column, right_column)
+            report(f"from_columns {lines} lines", seconds)
+            seconds, _ = timed(index.extend, appends)
+            report(f"{args.appends} appends to the index", seconds, f"distance={index.distance} similarity={index.similarity}")
+            seconds, answers = timed(
+                lambda: (shared.total_distance(left_column, right_column), shared.similarity(left_column, right_column))
+            )
+            report(f"one full solve of {lines} lines", seconds, f"x {args.appends} = {seconds * args.appends:.0f} s")
+            path.unlink()
+
+
+def _solve_in_child(mode: str, path: Path, run_bytes: int, results: multiprocessing.Queue):
+    start = time.perf_counter()
+    if mode == "in memory":
+        left_column, right_column = shared.columns(path)
+        answers = shared.total_distance(left_column, right_column), shared.similarity(left_column, right_column)
+    else:
+        answers = shared.solve_sorted(*shared.sorted_columns(path, run_bytes))
+    results.put((time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, answers))
+
+
+def external(args):
+    """Peak RSS of solving in memory against spilling sorted runs, each in a fresh process"""
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        for lines in args.lines:
+            path = Path(directory) / f"{lines}.txt"
+            # Generated apart too, a child's peak RSS starts from its parent's when it's forked
+            writer = context.Process(target=write_locations, args=(path, lines))
+            writer.start()
+            writer.join()
+            for mode in ("in memory", "external"):
+                results = context.Queue()
+                process = context.Process(target=_solve_in_child, args=(mode, path, args.run_bytes, results))
+                process.start()
+                seconds, peak_kib, answers = results.get()
+                process.join()
+                report(f"{mode} {lines} lines", seconds, f"peak RSS {peak_kib / 1024:.0f} MiB answers={answers}")
+            path.unlink()
+
+
+BENCHMARKS = {
+    "columns": columns,
+    "incremental": incremental,
+    "external": external,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmark", choices=BENCHMARKS)
+    parser.add_argument("--lines", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--appends", type=int, default=10_000)
+    parser.add_argument("--run-bytes", type=int, default=1 << 26)
+    parser.add_argument("--baseline-limit", type=int, default=10_000_000,
+                        help="skip the line by line solution above this many lines")
+    arguments = parser.parse_args()
+    BENCHMARKS[arguments.benchmark](arguments)
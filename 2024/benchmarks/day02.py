@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+"""
+Day 2 benchmarks on long generated reports, run from the 2024 directory:
+
+    python -m benchmarks.day02 potentially_safe --sizes 1000 10000 100000
+    python -m benchmarks.day02 batch --reports 100000 1000000
+    python -m benchmarks.day02 parallel --reports 3000000 --workers 1 2 4 8
+    python -m benchmarks.day02 storage --reports 100000
+"""
+import argparse
+import importlib
+import multiprocessing
+import random
+import tempfile
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+from benchmarks.grid import report, timed
+
+shared = importlib.import_module("day.02.shared")
+
+
+def worst_report(size: int):
+    """Increasing by one, then a last level that must be removed, so every earlier removal is tried first"""
+    return shared.Report(list(range(size)) + [size - 2])
+
+
+def rebuild_per_index(report_: "shared.Report") -> bool:
+    """The original potentially_safe, a new Report checked in three passes for every removed index"""
+    if report_.safe:
+        return True
+    for i in range(len(report_.levels)):
+        if shared.Report(report_.levels[:i] + report_.levels[i + 1:]).safe:
+            return True
+    return False
+
+
+def potentially_safe(args):
+    for size in args.sizes:
+        levels = worst_report(size)
+        seconds, result = timed(lambda: levels.potentially_safe)
+        report(f"potentially_safe {size} levels", seconds, f"safe={result}")
+        if size <= args.baseline_limit:
+            seconds, result = timed(rebuild_per_index, levels)
+            report(f"rebuild per index {size} levels", seconds, f"safe={result}")
+
+
+def report_text(count: int, seed: int = 2024) -> bytes:
+    """Reports of 5 to 8 levels shaped like the puzzle input, mostly small steps in one direction"""
+    generator = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        level, direction = generator.randrange(10, 90), generator.choice((1, -1))
+        levels = [level]
+        for _ in range(generator.randrange(4, 8)):
+            level += direction * generator.choice((1, 2, 3, 1, 2, 3, 0, 4, -1))
+            levels.append(level)
+        lines.append(" ".join(map(str, levels)))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def one_by_one(text: bytes) -> tuple[int, int]:
+    reports = [shared.Report.from_line(line) for line in text.decode().splitlines()]
+    return sum(report.safe for report in reports), sum(report.potentially_safe for report in reports)
+
+
+def batch(args):
+    for count in args.reports:
+        text = report_text(count)
+        seconds, reports = timed(shared.Reports.from_text, text)
+        report(f"Reports.from_text {count} reports", seconds)
+        seconds, safe = timed(lambda: int(reports.safe().sum()))
+        report(f"safe mask {count} reports", seconds, f"safe={safe}")
+        seconds, potentially_safe_ = timed(lambda: int(reports.potentially_safe().sum()))
+        report(f"potentially_safe mask {count} reports", seconds, f"potentially_safe={potentially_safe_}")
+        seconds, counts = timed(one_by_one, text)
+        report(f"one Report at a time {count} reports", seconds, f"counts={counts}")
+
+
+def parallel(args):
+    """Scaling of count_in_file with worker processes, bounded by the CPUs of the machine"""
+    print(f"{multiprocessing.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "input.txt"
+        for count in args.reports:
+            path.write_bytes(report_text(count))
+            single = None
+            for workers in args.workers:
+                seconds, result = timed(shared.count_in_file, path, shared.count_potentially_safe, workers, args.chunk_bytes)
+                single = single or seconds
+                report(f"{workers} workers {count} reports", seconds, f"speedup={single / seconds:.2f} potentially_safe={result}")
+
+
+@dataclass
+class ListReport:
+    """Report as it was stored before, a dict backed object holding a list of ints"""
+    levels: list[int]
+
+
+def storage(args):
+    lines = report_text(args.reports[0]).decode().splitlines()
+    for name, build in (
+            ("ListReport", lambda: [ListReport(list(map(int, line.split()))) for line in lines]),
+            ("Report", lambda: [shared.Report.from_line(line) for line in lines]),
+    ):
+        tracemalloc.start()
+        reports = build()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{name:<12} {len(reports)} reports {memory / 2 ** 20:>8.1f} MiB")
+
+
+BENCHMARKS = {
+    "potentially_safe": potentially_safe,
+    "batch": batch,
+    "parallel": parallel,
+    "storage": storage,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmark", choices=BENCHMARKS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--reports", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, multiprocessing.cpu_count()])
+    parser.add_argument("--chunk-bytes", type=int, default=1 << 24)
+    parser.add_argument("--baseline-limit", type=int, default=10_000,
+                        help="skip rebuilding reports per index above this many levels")
+    arguments = parser.parse_args()
+    BENCHMARKS[arguments.benchmark](arguments)
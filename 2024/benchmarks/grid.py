@@ -0,0 +1,342 @@
+#!/usr/bin/python3
+"""
+Grid benchmarks, run from the 2024 directory:
+
+    python -m benchmarks.grid storage --size 1000
+    python -m benchmarks.grid count_word --sizes 100 1000 10000
+    python -m benchmarks.grid position --size 1000
+    python -m benchmarks.grid words --size 1000
+    python -m benchmarks.grid windows --size 1000
+    python -m benchmarks.grid open_file --size 10000
+    python -m benchmarks.grid match_pattern --sizes 100 1000
+    python -m benchmarks.grid anchors --size 1000
+    python -m benchmarks.grid parallel --size 20000 --workers 8
+    python -m benchmarks.grid digits --size 1000
+    python -m benchmarks.grid sparse --size 1000
+    python -m benchmarks.grid components --size 1000
+    python -m benchmarks.grid snapshots --size 100
+    python -m benchmarks.grid saved --size 2000
+"""
+import argparse
+import copy
+import multiprocessing
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from lib.grid import BoundsError, Grid, Direction, Position
+from lib.sparse import SparseGrid
+
+
+def synthetic_rows(size: int, alphabet: str = "XMAS", seed: int = 2024) -> list[str]:
+    """
+    >>> synthetic_rows(3, seed=1)
+    ['XSS', 'MMM', 'ASX']
+    """
+    generator = random.Random(seed)
+    return ["".join(generator.choices(alphabet, k=size)) for _ in range(size)]
+
+
+def timed(func: Callable, *args, repeat: int = 1):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(name: str, seconds: float, extra: str = ""):
+    print(f"{name:<40} {seconds * 1000:>10.1f} ms {extra}")
+
+
+def storage(args):
+    rows = synthetic_rows(args.size)
+    seconds, _ = timed(Grid.from_iterables, rows, repeat=3)
+    tracemalloc.start()
+    Grid.from_iterables(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    report(f"from_iterables {args.size}x{args.size}", seconds, f"{peak / 2 ** 20:>8.1f} MiB peak")
+
+
+def per_cell_xmas_count(grid: Grid) -> int:
+    """The original day 04 part one loop"""
+    xmas_count = 0
+    for x in filter(lambda cell: cell.content == "X", grid):
+        words = list(grid.words(x.position, 4))
+        xmas_count += len(list(filter(lambda word: word == "XMAS", words)))
+    return xmas_count
+
+
+def count_word(args):
+    for size in args.sizes:
+        grid = Grid.from_iterables(synthetic_rows(size))
+        seconds, count = timed(grid.count_word, "XMAS")
+        report(f"count_word {size}x{size}", seconds, f"count={count}")
+        seconds, count = timed(lambda: Grid.from_iterables(grid.rows())._count_word_bitboards("XMAS"))
+        report(f"bitboards {size}x{size}", seconds, f"count={count}")
+        if size <= args.baseline_limit:
+            seconds, count = timed(per_cell_xmas_count, grid)
+            report(f"per cell words {size}x{size}", seconds, f"count={count}")
+
+
+def position(args):
+    grid = Grid.from_iterables(synthetic_rows(args.size))
+    positions = [cell.position for cell in grid]
+    seconds, _ = timed(lambda: [p.offset(Direction.SE, 1) for p in positions], repeat=3)
+    report(f"Position.offset x{len(positions)}", seconds, f"{len(positions) / seconds / 1e6:>8.2f} M/s")
+    inside = [p for p in positions if p.x < grid.width - 1 and p.y < grid.height - 1]
+    seconds, _ = timed(lambda: [grid.at(p) for p in inside], repeat=3)
+    report(f"Grid.at x{len(inside)}", seconds, f"{len(inside) / seconds / 1e6:>8.2f} M/s")
+    seconds, _ = timed(lambda: [grid.offset(p, Direction.SE, 1) for p in inside], repeat=3)
+    report(f"Grid.offset x{len(inside)}", seconds, f"{len(inside) / seconds / 1e6:>8.2f} M/s")
+
+
+def words(args):
+    grid = Grid.from_iterables(synthetic_rows(args.size))
+    border = [
+        cell.position for cell in grid
+        if min(cell.position.x, cell.position.y, grid.width - 1 - cell.position.x, grid.height - 1 - cell.position.y) < 3
+    ]
+    # Single runs on purpose, a first call has to pay for any setup words() does
+    seconds, found = timed(lambda: sum(len(list(grid.words(p, 4))) for p in border))
+    report(f"words near the border x{len(border)}", seconds, f"words={found}")
+    seconds, found = timed(lambda: sum(len(list(grid.words(p, 1, 8))) for p in border))
+    report(f"words 1-8 near the border x{len(border)}", seconds, f"words={found}")
+
+
+def windows(args):
+    grid = Grid.from_iterables(synthetic_rows(args.size))
+    corners = [Position(x, y) for y in range(grid.height - 2) for x in range(grid.width - 2)]
+    three = Position(3, 3)
+    seconds, _ = timed(lambda: [grid.sub_grid(corner, three).at(Position(1, 1)) for corner in corners])
+    report(f"3x3 sub_grid views x{len(corners)}", seconds)
+    seconds, _ = timed(lambda: [grid.sub_grid(corner, three).copy().at(Position(1, 1)) for corner in corners])
+    report(f"3x3 sub_grid copies x{len(corners)}", seconds)
+
+
+def _open_and_probe(loader_name: str, path: Path) -> tuple[float, int]:
+    start = time.perf_counter()
+    grid = getattr(Grid, loader_name)(path)
+    grid.word(Position(0, grid.height - 1), Direction.NE, 4)
+    seconds = time.perf_counter() - start
+    return seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def open_file(args):
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "grid.txt"
+        with path.open("w") as open_file:
+            for row in synthetic_rows(args.size):
+                open_file.write(row + "\n")
+        for loader_name in ("from_file", "from_mmap"):
+            # A fresh process per loader so the peak RSS belongs to that loader alone
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                seconds, max_rss = executor.submit(_open_and_probe, loader_name, path).result()
+            report(f"{loader_name} {args.size}x{args.size}", seconds, f"{max_rss / 2 ** 10:>8.1f} MiB max RSS")
+
+
+X_MAS = ("M.S", ".A.", "M.S")
+
+
+def per_cell_x_mas_count(grid: Grid) -> int:
+    """The original day 04 part two loop, two diagonal words per 'A'"""
+    x_mas_count = 0
+    for cell in grid:
+        if cell.content != "A":
+            continue
+        try:
+            a = grid.word(cell.position.offset(Direction.NW, 1), Direction.SE, 3)
+            b = grid.word(cell.position.offset(Direction.SW, 1), Direction.NE, 3)
+        except BoundsError:
+            continue
+        if a in {"MAS", "SAM"} and b in {"MAS", "SAM"}:
+            x_mas_count += 1
+    return x_mas_count
+
+
+def match_pattern(args):
+    for size in args.sizes:
+        grid = Grid.from_iterables(synthetic_rows(size))
+        seconds, anchors = timed(grid.match_pattern, X_MAS, ".", True)
+        report(f"match_pattern X-MAS {size}x{size}", seconds, f"count={len(anchors)}")
+        if size <= args.baseline_limit:
+            seconds, count = timed(per_cell_x_mas_count, grid)
+            report(f"per cell X-MAS {size}x{size}", seconds, f"count={count}")
+
+
+def anchors(args):
+    generator = random.Random(2024)
+    rows = ["".join("X" if generator.random() < 0.001 else "." for _ in range(args.size)) for _ in range(args.size)]
+    grid = Grid.from_iterables(rows)
+    seconds, found = timed(lambda: [cell.position for cell in grid if cell.content == "X"])
+    report(f"scan every cell for 'X' {args.size}x{args.size}", seconds, f"found={len(found)}")
+    seconds, found = timed(grid.positions_of, "X")
+    report(f"positions_of('X'), building the index", seconds, f"found={len(found)}")
+    seconds, found = timed(grid.positions_of, "X", repeat=3)
+    report(f"positions_of('X'), indexed", seconds, f"found={len(found)}")
+
+
+def parallel(args):
+    grid = Grid.from_iterables(synthetic_rows(args.size))
+    for workers in range(1, args.workers + 1):
+        seconds, count = timed(grid.count_word, "XMAS", workers)
+        report(f"count_word {args.size}x{args.size} workers={workers}", seconds, f"count={count}")
+
+
+def digits(args):
+    rows = synthetic_rows(args.size, alphabet="0123456789")
+    seconds, grid = timed(Grid.from_iterables, rows, int)
+    report(f"from_iterables(int) {args.size}x{args.size}", seconds)
+    seconds, typed = timed(Grid.from_digits, rows)
+    report(f"from_digits {args.size}x{args.size}", seconds)
+    positions = [Position(x, y) for y in range(0, args.size - 9, 7) for x in range(0, args.size - 9, 7)]
+    for name, numbers in (("list", grid), ("array('b')", typed)):
+        seconds, total = timed(lambda: sum(numbers.word(p, Direction.SE, 10) for p in positions), repeat=3)
+        report(f"word sums over {name} x{len(positions)}", seconds, f"total={total}")
+
+
+def sparse(args):
+    """Where memory and lookups cross over between a dense Grid and a SparseGrid"""
+    generator = random.Random(2024)
+    probes = [Position(generator.randrange(args.size), generator.randrange(args.size)) for _ in range(100_000)]
+    for density in (0.0001, 0.001, 0.01, 0.05, 0.1, 0.3):
+        rows = ["".join("#" if generator.random() < density else "." for _ in range(args.size)) for _ in range(args.size)]
+        results = {}
+        for kind, build in (("dense", lambda: Grid.from_iterables(rows)), ("sparse", lambda: SparseGrid.from_iterables(rows))):
+            tracemalloc.start()
+            grid = build()
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            seconds, _ = timed(lambda: [grid.at(p) for p in probes])
+            results[kind] = memory, seconds
+        (dense_memory, dense_seconds), (sparse_memory, sparse_seconds) = results["dense"], results["sparse"]
+        print(
+            f"density {density:<7} dense {dense_memory / 2 ** 20:>7.2f} MiB {dense_seconds * 1000:>7.1f} ms"
+            f" | sparse {sparse_memory / 2 ** 20:>7.2f} MiB {sparse_seconds * 1000:>7.1f} ms"
+            f" | smaller: {'sparse' if sparse_memory < dense_memory else 'dense'}"
+        )
+
+
+def dict_components(rows: list[str], char: str) -> list[int]:
+    """The 2023 approach, a dict of dicts grid and a flood fill over Position objects"""
+    cells = {y: {x: content for x, content in enumerate(row)} for y, row in enumerate(rows)}
+    seen, sizes = set(), []
+    for y, row in cells.items():
+        for x, content in row.items():
+            if content != char or Position(x, y) in seen:
+                continue
+            stack, size = [Position(x, y)], 0
+            seen.add(Position(x, y))
+            while stack:
+                position = stack.pop()
+                size += 1
+                for direction in (Direction.N, Direction.E, Direction.S, Direction.W):
+                    neighbour = position.offset(direction, 1)
+                    if cells.get(neighbour.y, {}).get(neighbour.x) == char and neighbour not in seen:
+                        seen.add(neighbour)
+                        stack.append(neighbour)
+            sizes.append(size)
+    return sizes
+
+
+def components(args):
+    rows = synthetic_rows(args.size, alphabet="#..")
+    grid = Grid.from_iterables(rows)
+    seconds, sizes = timed(dict_components, rows, "#")
+    report(f"dict flood fill {args.size}x{args.size}", seconds, f"components={len(sizes)}")
+    seconds, labelled = timed(grid.label_components, lambda content: content == "#")
+    report(f"label_components {args.size}x{args.size}", seconds, f"components={len(labelled)}")
+
+
+def snapshots(args):
+    """Keeping every state of a simulation that changes a few rows per step, as 2023 day 14 did for cycles"""
+    generator = random.Random(2024)
+    steps = 1000
+    writes = [[Position(generator.randrange(args.size), generator.randrange(args.size)) for _ in range(5)] for _ in range(steps)]
+    rows = synthetic_rows(args.size, alphabet="O#.")
+
+    def deep_copies():
+        matrix, history = [list(row) for row in rows], []
+        for step in writes:
+            for position in step:
+                matrix[position.y][position.x] = "O"
+            history.append(copy.deepcopy(matrix))
+        return history
+
+    def grid_copies():
+        grid, history = Grid(width=args.size, height=args.size, contents=list("".join(rows))), []
+        for step in writes:
+            for position in step:
+                grid.set(position, "O")
+            history.append(grid.copy())
+        return history
+
+    def snapshots_():
+        grid, history = Grid.from_iterables(rows).mutable(), []
+        for step in writes:
+            for position in step:
+                grid.set(position, "O")
+            history.append(grid.snapshot())
+        return history
+
+    for name, simulate in (("deepcopy list[list]", deep_copies), ("Grid.copy", grid_copies), ("snapshot", snapshots_)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        history = simulate()
+        seconds = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        report(f"{name}, {steps} steps {args.size}x{args.size}", seconds, f"{memory / 2 ** 20:.1f} MiB")
+        del history
+
+
+def saved(args):
+    """Parsing the text input on every run against loading the saved grid"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "input.txt"
+        path.write_text("\n".join(synthetic_rows(args.size)) + "\n")
+        digits = Path(directory) / "digits.txt"
+        digits.write_text("\n".join(synthetic_rows(args.size, alphabet="0123456789")) + "\n")
+        for label, input_path, parse in (("text", path, Grid.from_file), ("digits", digits, Grid.of_ints)):
+            seconds, _ = timed(parse, input_path, repeat=3)
+            report(f"parse {label} {args.size}x{args.size}", seconds)
+            seconds, _ = timed(Grid.cached, input_path, parse)
+            report(f"cached, first run {label}", seconds)
+            seconds, grid = timed(Grid.cached, input_path, parse, repeat=3)
+            report(f"cached, later runs {label}", seconds, f"count_of 5={grid.count_of(5)}" if label == "digits" else "")
+
+
+BENCHMARKS = {
+    "storage": storage,
+    "count_word": count_word,
+    "position": position,
+    "words": words,
+    "windows": windows,
+    "open_file": open_file,
+    "match_pattern": match_pattern,
+    "anchors": anchors,
+    "parallel": parallel,
+    "digits": digits,
+    "sparse": sparse,
+    "components": components,
+    "snapshots": snapshots,
+    "saved": saved,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmark", choices=BENCHMARKS)
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--baseline-limit", type=int, default=1000,
+                        help="largest size to also run the original per cell search on")
+    arguments = parser.parse_args()
+    BENCHMARKS[arguments.benchmark](arguments)
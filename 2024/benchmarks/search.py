@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+"""
+Search benchmarks, run from the 2024 directory:
+
+    python -m benchmarks.search pairs --size 100 --galaxies 30
+    python -m benchmarks.search adjacency --size 300 --galaxies 30
+"""
+import argparse
+import random
+from itertools import combinations
+
+from benchmarks.grid import report, timed
+from lib.grid import CARDINALS, Grid, Position
+from lib.search import astar, bfs
+
+try:
+    from pathfinding.core.grid import Grid as PathGrid
+    from pathfinding.finder.a_star import AStarFinder
+except ImportError:  # Only needed to compare against, as 2023 days 10, 11 and 21 did
+    PathGrid = AStarFinder = None
+
+
+def galaxy_grid(size: int, galaxies: int, seed: int = 2024) -> tuple[Grid, list[Position]]:
+    generator = random.Random(seed)
+    positions = sorted({(generator.randrange(size), generator.randrange(size)) for _ in range(galaxies)})
+    rows = [["."] * size for _ in range(size)]
+    for x, y in positions:
+        rows[y][x] = "#"
+    return Grid.from_iterables(["".join(row) for row in rows]), [Position(x, y) for x, y in positions]
+
+
+def bfs_per_galaxy(grid: Grid, galaxies: list[Position]) -> int:
+    total = 0
+    for index, galaxy in enumerate(galaxies):
+        result = bfs(grid, [galaxy])
+        total += sum(result.distance(other) for other in galaxies[index + 1:])
+    return total
+
+
+def astar_per_pair(grid: Grid, galaxies: list[Position]) -> int:
+    return sum(len(astar(grid, a, b)) - 1 for a, b in combinations(galaxies, 2))
+
+
+def pathfinding_per_pair(grid: Grid, galaxies: list[Position]) -> int:
+    """The 2023 approach, the pathfinding object graph is rebuilt for every query"""
+    matrix = [[1] * grid.width for _ in range(grid.height)]
+    total = 0
+    for a, b in combinations(galaxies, 2):
+        path_grid = PathGrid(matrix=matrix)
+        path, _ = AStarFinder().find_path(path_grid.node(a.x, a.y), path_grid.node(b.x, b.y), path_grid)
+        total += len(path) - 1
+    return total
+
+
+def pairs(args):
+    grid, galaxies = galaxy_grid(args.size, args.galaxies)
+    label = f"{len(galaxies)} galaxies {args.size}x{args.size}"
+    seconds, total = timed(bfs_per_galaxy, grid, galaxies)
+    report(f"bfs per galaxy, {label}", seconds, f"total={total}")
+    seconds, total = timed(astar_per_pair, grid, galaxies)
+    report(f"astar per pair, {label}", seconds, f"total={total}")
+    if AStarFinder is None:
+        print("pathfinding isn't installed, skipping it")
+    else:
+        seconds, total = timed(pathfinding_per_pair, grid, galaxies)
+        report(f"pathfinding per pair, {label}", seconds, f"total={total}")
+
+
+def adjacency(args):
+    grid, galaxies = galaxy_grid(args.size, args.galaxies)
+    label = f"{args.size}x{args.size}"
+    seconds, adjacency_ = timed(grid.adjacency)
+    report(f"build adjacency, {label}", seconds)
+    seconds, _ = timed(bfs, grid, galaxies[:1])
+    report(f"bfs expanding lazily, {label}", seconds)
+    seconds, _ = timed(bfs, grid, galaxies[:1], None, CARDINALS, None, adjacency_)
+    report(f"bfs reusing adjacency, {label}", seconds)
+    near = Position(min(galaxies[0].x + 1, args.size - 1), galaxies[0].y)
+    seconds, _ = timed(astar, grid, galaxies[0], near)
+    report(f"astar to a neighbour, {label}", seconds)
+
+
+BENCHMARKS = {
+    "pairs": pairs,
+    "adjacency": adjacency,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmark", choices=BENCHMARKS)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--galaxies", type=int, default=30)
+    arguments = parser.parse_args()
+    BENCHMARKS[arguments.benchmark](arguments)
@@ -1,11 +1,7 @@
 #!/usr/bin/python3
 
-from shared import data
+from shared import data, total_distance
 
 left_column, right_column = data()
 
-distance = 0
-for first, second in zip(sorted(left_column), sorted(right_column)):
-    distance += abs(first - second)
-print(distance)
-
+print(total_distance(left_column, right_column))
@@ -1,17 +1,7 @@
 #!/usr/bin/python3
-from collections import defaultdict
 
-from shared import data
+from shared import data, similarity
 
 left_column, right_column = data()
 
-similarity = 0
-
-right_column_count = defaultdict(int)
-
-for right in right_column:
-    right_column_count[right] += 1
-for left in left_column:
-    similarity += left * right_column_count[left]
-
-print(similarity)
\ No newline at end of file
+print(similarity(left_column, right_column))
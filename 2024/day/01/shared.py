@@ -1,13 +1,438 @@
+import heapq
+import operator
+import tempfile
+import warnings
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from functools import reduce
+from itertools import accumulate, groupby, pairwise
+from math import isqrt
 from pathlib import Path
+from typing import Generator, Iterable, Iterator
 
+try:
+    import numpy
+except ImportError:  # NumPy is optional, the columns are then array('q') and solved in pure Python
+    numpy = None
 
-def data(stem="input.txt"):
-    left_column = []
-    right_column = []
+# Lines are parsed this many bytes at a time
+CHUNK_BYTES = 1 << 24
+# Locations up to this are counted with a table as long as the largest one, bigger ones are sorted
+DENSE_LIMIT = 1 << 24
+# Fewest distinct locations per block of a LocationIndex
+MIN_BLOCK = 64
+# Input bytes sorted in memory per spilled run, and locations read at a time from each run when merging
+RUN_BYTES = 1 << 26
+RUN_READ = 1 << 15
+
+
+def data(stem="input.txt", streaming=False):
+    """Both columns in memory, or with streaming both sorted and merged from temporary files"""
     input_path = Path(__file__).parent / stem
-    with open(input_path) as open_file:
-        for line in open_file:
-            left, right = line.split()
-            left_column.append(int(left))
-            right_column.append(int(right))
-    return left_column, right_column
+    if streaming:
+        return sorted_columns(input_path)
+    return columns(input_path)
+
+
+def columns(path: Path):
+    """
+    Both location columns, parsed in bulk a chunk of lines at a time rather than one int() per line.
+    NumPy int64 arrays when NumPy is installed, otherwise array('q').
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as directory:
+    ...     path = Path(directory) / "input.txt"
+    ...     _ = path.write_text("3   4\\n4   3\\n2   50\\n")
+    ...     left, right = columns(path)
+    ...     print(list(map(int, left)), list(map(int, right)))
+    [3, 4, 2] [4, 3, 50]
+    """
+    parse = _parse_numpy if numpy is not None else _parse_python
+    left_chunks, right_chunks = [], []
+    for text in _line_chunks(path):
+        values = parse(text)
+        if len(values) % 2:
+            raise ValueError(f"{path} has an odd number of locations")
+        left_chunks.append(values[0::2])
+        right_chunks.append(values[1::2])
+    if numpy is not None:
+        return tuple(
+            numpy.concatenate(chunks) if chunks else numpy.zeros(0, dtype=numpy.int64)
+            for chunks in (left_chunks, right_chunks)
+        )
+    return tuple(reduce(operator.iadd, chunks, array("q")) for chunks in (left_chunks, right_chunks))
+
+
+def sorted_columns(path: Path, run_bytes: int = RUN_BYTES) -> tuple[Iterator[int], Iterator[int]]:
+    """
+    Both columns as sorted streams, for inputs bigger than memory. Every run_bytes of input is parsed,
+    each column of it sorted and spilled to a temporary file, then the runs of a column are k-way merged.
+    Memory holds one run while spilling and RUN_READ locations per run while merging.
+    The files are removed once both streams are gone.
+
+    >>> with tempfile.TemporaryDirectory() as directory:
+    ...     path = Path(directory) / "input.txt"
+    ...     _ = path.write_text("3   4\\n4   3\\n2   5\\n1   3\\n3   9\\n3   3\\n")
+    ...     left, right = sorted_columns(path, run_bytes=12)
+    ...     print(list(left), list(right))
+    [1, 2, 3, 3, 3, 4] [3, 3, 3, 4, 5, 9]
+    >>> with tempfile.TemporaryDirectory() as directory:
+    ...     path = Path(directory) / "input.txt"
+    ...     _ = path.write_text("1   2\\n3   4\\n\\n\\n")
+    ...     left, right = sorted_columns(path, run_bytes=12)
+    ...     print(list(left), list(right))
+    [1, 3] [2, 4]
+    """
+    parse = _parse_numpy if numpy is not None else _parse_python
+    spill = tempfile.TemporaryDirectory()
+    left_runs, right_runs = [], []
+    for text in _line_chunks(path, run_bytes):
+        values = parse(text)
+        if len(values) % 2:
+            raise ValueError(f"{path} has an odd number of locations")
+        for side, column, runs in (("left", values[0::2], left_runs), ("right", values[1::2], right_runs)):
+            run_path = Path(spill.name) / f"{side}-{len(runs)}.run"
+            with run_path.open("wb") as open_file:
+                if numpy is not None:
+                    numpy.sort(column).tofile(open_file)
+                else:
+                    array("q", sorted(column)).tofile(open_file)
+            runs.append(run_path)
+    return _merge_runs(left_runs, spill), _merge_runs(right_runs, spill)
+
+
+def _merge_runs(runs: list[Path], spill: tempfile.TemporaryDirectory) -> Generator[int, None, None]:
+    """The sorted runs merged, spill is only held on to so the files outlive the stream"""
+    yield from heapq.merge(*map(_read_run, runs))
+
+
+def _read_run(path: Path) -> Generator[int, None, None]:
+    with path.open("rb") as open_file:
+        while True:
+            block = array("q")
+            try:
+                block.fromfile(open_file, RUN_READ)
+            except EOFError:  # The last block, fromfile still keeps what it read
+                yield from block
+                return
+            yield from block
+
+
+def solve_sorted(left_sorted: Iterable[int], right_sorted: Iterable[int]) -> tuple[int, int]:
+    """
+    Total distance and similarity of sorted columns in one merge over both, holding nothing but counters.
+    Between two consecutive locations the distance grows by |D| per location, D counting the left
+    locations so far minus the right ones, as in LocationIndex.
+
+    >>> solve_sorted([1, 2, 3, 3, 3, 4], [3, 3, 3, 4, 5, 9])
+    (11, 31)
+    >>> solve_sorted([1, 2], [3])
+    Traceback (most recent call last):
+    ...
+    ValueError: Columns differ in length
+    """
+    left_groups = ((location, sum(1 for _ in group)) for location, group in groupby(left_sorted))
+    right_groups = ((location, sum(1 for _ in group)) for location, group in groupby(right_sorted))
+    left, right = next(left_groups, None), next(right_groups, None)
+    distance = similarity = difference = 0
+    previous = None
+    while left or right:
+        location = min(group[0] for group in (left, right) if group)
+        if previous is not None:
+            distance += abs(difference) * (location - previous)
+        left_count = right_count = 0
+        if left and left[0] == location:
+            left_count, left = left[1], next(left_groups, None)
+        if right and right[0] == location:
+            right_count, right = right[1], next(right_groups, None)
+        difference += left_count - right_count
+        similarity += location * left_count * right_count
+        previous = location
+    if difference:
+        raise ValueError("Columns differ in length")
+    return distance, similarity
+
+
+def _line_chunks(path: Path, block_bytes: int = CHUNK_BYTES) -> Generator[bytes, None, None]:
+    """Blocks of about block_bytes holding whole lines, the start of a cut line is carried to the next block"""
+    carried = b""
+    with path.open("rb") as open_file:
+        while block := open_file.read(block_bytes):
+            block = carried + block
+            end = block.rfind(b"\n") + 1
+            if end:
+                yield block[:end]
+            carried = block[end:]
+    if carried:
+        yield carried
+
+
+def _parse_python(text: bytes) -> array:
+    return array("q", map(int, text.split()))
+
+
+def _parse_numpy(text: bytes) -> "numpy.ndarray":
+    """
+    All the whitespace separated ints of text, parsed by NumPy in C
+
+    >>> _parse_numpy(b"12   7\\n0 345\\n").tolist()
+    [12, 7, 0, 345]
+    >>> _parse_numpy(b"1 x")
+    Traceback (most recent call last):
+    ...
+    ValueError: Locations must be whitespace separated ints
+    >>> _parse_numpy(b"\\n \\n").tolist()
+    []
+    """
+    if not text or text.isspace():
+        # fromstring reads a lone 0 from text without any locations
+        return numpy.zeros(0, dtype=numpy.int64)
+    with warnings.catch_warnings():
+        # Older NumPy warns, rather than raises, when it stops at something that isn't an int
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            return numpy.fromstring(text, dtype=numpy.int64, sep=" ")
+        except (DeprecationWarning, ValueError):
+            raise ValueError("Locations must be whitespace separated ints") from None
+
+
+def total_distance(left_column, right_column) -> int:
+    """
+    >>> total_distance(array("q", [3, 4, 2, 1, 3, 3]), array("q", [4, 3, 5, 3, 9, 3]))
+    11
+    """
+    if numpy is not None:
+        return int(numpy.abs(numpy.sort(left_column) - numpy.sort(right_column)).sum())
+    return sum(abs(left - right) for left, right in zip(sorted(left_column), sorted(right_column)))
+
+
+def similarity(left_column, right_column) -> int:
+    """
+    Each left location times the number of times it appears on the right
+
+    >>> similarity(array("q", [3, 4, 2, 1, 3, 3]), array("q", [4, 3, 5, 3, 9, 3]))
+    31
+    >>> similarity(array("q", [3, 10 ** 12, 7]), array("q", [10 ** 12, 3, 10 ** 12]))
+    2000000000003
+    """
+    if numpy is not None:
+        left_column, right_column = numpy.asarray(left_column), numpy.asarray(right_column)
+        if not len(left_column) or not len(right_column):
+            return 0
+        lowest, highest = int(right_column.min()), int(right_column.max())
+        if lowest >= 0 and highest <= DENSE_LIMIT:
+            # Small locations, as in the puzzle, are counted straight into a table indexed by location
+            right_counts = numpy.bincount(right_column)
+            left_column = left_column[(left_column >= 0) & (left_column <= highest)]
+            return int((left_column * right_counts[left_column]).sum())
+        right_values, right_counts = numpy.unique(right_column, return_counts=True)
+        found = numpy.searchsorted(right_values, left_column).clip(max=len(right_values) - 1)
+        matched = right_values[found] == left_column
+        return int((left_column[matched] * right_counts[found[matched]]).sum())
+    right_column_count = Counter(right_column)
+    return sum(left * right_column_count[left] for left in left_column)
+
+
+class LocationIndex:
+    """
+    Total distance and similarity of two location lists, kept up to date as pairs are added and removed.
+
+    Pairing sorted columns rank by rank, the total distance is also the sum over every location t of
+    |D(t)|, where D(t) counts left locations <= t minus right locations <= t. A new left location adds
+    one to D from there on, a right one subtracts one. D only changes at locations that have been seen,
+    so it's kept once per distinct location, weighted by the gap up to the next one, in sorted blocks
+    with a lazy offset and a histogram of weights each. A change costs O(sqrt(distinct locations)) and
+    memory grows with the distinct locations rather than the largest one.
+    Similarity changes by one product per location from the count indexes.
+
+    >>> index = LocationIndex()
+    >>> index.extend(zip([3, 4, 2, 1, 3, 3], [4, 3, 5, 3, 9, 3]))
+    >>> index.distance, index.similarity
+    (11, 31)
+    >>> index.remove(1, 9)
+    >>> index.distance == total_distance(array("q", [3, 4, 2, 3, 3]), array("q", [4, 3, 5, 3, 3]))
+    True
+    >>> index.add(5000, 4), index.similarity == similarity(array("q", [3, 4, 2, 3, 3, 5000]), array("q", [4, 3, 5, 3, 3, 4]))
+    (None, True)
+    >>> index.add(10 ** 12, 1), index.distance == total_distance(array("q", [3, 4, 2, 3, 3, 5000, 10 ** 12]), array("q", [4, 3, 5, 3, 3, 4, 1]))
+    (None, True)
+    >>> index.remove(7, 7)
+    Traceback (most recent call last):
+    ...
+    ValueError: Pair (7, 7) isn't in the index
+    """
+
+    def __init__(self):
+        self.left_count = Counter()
+        self.right_count = Counter()
+        self.similarity = 0
+        self._rebuild()
+
+    def __len__(self) -> int:
+        return self.left_count.total()
+
+    @classmethod
+    def from_columns(cls, left_column, right_column) -> "LocationIndex":
+        """
+        Index whole columns at once, counting them then building D in one pass
+
+        >>> index = LocationIndex.from_columns(array("q", [3, 4, 2, 1, 3, 3]), array("q", [4, 3, 5, 3, 9, 3]))
+        >>> index.distance, index.similarity, len(index)
+        (11, 31, 6)
+        """
+        if len(left_column) != len(right_column):
+            raise ValueError(f"Columns differ in length, {len(left_column)} and {len(right_column)}")
+        index = cls()
+        index.left_count.update(map(int, left_column))
+        index.right_count.update(map(int, right_column))
+        index.similarity = sum(location * count * index.right_count[location] for location, count in index.left_count.items())
+        index._rebuild()
+        return index
+
+    def add(self, left: int, right: int):
+        self.left_count[left] += 1
+        self.similarity += left * self.right_count[left]
+        self.right_count[right] += 1
+        self.similarity += right * self.left_count[right]
+        self._insert(left)
+        self._insert(right)
+        self._add_pair(left, right, 1)
+
+    def remove(self, left: int, right: int):
+        if not self.left_count[left] or not self.right_count[right]:
+            raise ValueError(f"Pair ({left}, {right}) isn't in the index")
+        self.similarity -= left * self.right_count[left]
+        self.left_count[left] -= 1
+        self.similarity -= right * self.left_count[right]
+        self.right_count[right] -= 1
+        self._add_pair(left, right, -1)
+
+    def extend(self, pairs: Iterable[tuple[int, int]]):
+        for left, right in pairs:
+            self.add(left, right)
+
+    def _add_pair(self, left: int, right: int, change: int):
+        """D gains change from left on and loses it from right on, so only locations in between move"""
+        if left < right:
+            self._add_between(left, right, change)
+        elif right < left:
+            self._add_between(right, left, -change)
+
+    def _rebuild(self):
+        """Recompute D for every distinct location from the count indexes"""
+        locations = sorted(self.left_count.keys() | self.right_count.keys())
+        # Whole blocks are cheaper to shift than single locations, so blocks are shorter than sqrt(locations)
+        self.block = max(MIN_BLOCK, isqrt(len(locations)) // 2)
+        differences = list(accumulate(self.left_count[location] - self.right_count[location] for location in locations))
+        # D is 0 past the last location, which is given no weight
+        weights = [following - location for location, following in pairwise(locations)] + [0] * bool(locations)
+        starts = range(0, len(locations), self.block)
+        self.locations = [locations[start:start + self.block] for start in starts]
+        self.differences = [differences[start:start + self.block] for start in starts]
+        self.weights = [weights[start:start + self.block] for start in starts]
+        self.firsts = [block[0] for block in self.locations]
+        self.lazy = [0] * len(starts)
+        self.totals, self.histograms, self.non_negative = [0] * len(starts), [None] * len(starts), [0] * len(starts)
+        for block in range(len(starts)):
+            self._summarise(block)
+        self.distance = sum(abs(difference) * weight for difference, weight in zip(differences, weights))
+
+    def _summarise(self, block: int):
+        """Recompute the total weight, histogram and non negative weight of block"""
+        histogram = Counter()
+        for difference, weight in zip(self.differences[block], self.weights[block]):
+            histogram[difference] += weight
+        self.totals[block] = sum(self.weights[block])
+        self.histograms[block] = histogram
+        self.non_negative[block] = sum(weight for difference, weight in histogram.items() if difference + self.lazy[block] >= 0)
+
+    def _insert(self, location: int):
+        """Give location a place of its own, splitting the gap it falls in, which leaves the distance as it is"""
+        if not self.locations:
+            self.locations, self.differences, self.weights, self.firsts = [[location]], [[0]], [[0]], [location]
+            self.lazy, self.totals, self.histograms, self.non_negative = [0], [0], [Counter({0: 0})], [0]
+            return
+        block = max(bisect_right(self.firsts, location) - 1, 0)
+        locations, differences, weights = self.locations[block], self.differences[block], self.weights[block]
+        position = bisect_left(locations, location)
+        if position < len(locations) and locations[position] == location:
+            return
+        if position == 0:
+            # Before every location, where D is 0
+            difference, weight = -self.lazy[block], locations[0] - location
+            self.firsts[block] = location
+            self.totals[block] += weight
+            self.histograms[block][difference] += weight
+            self.non_negative[block] += weight
+        elif block == len(self.locations) - 1 and position == len(locations):
+            # After every location, the last one's gap now reaches this one, where D is 0 too
+            difference, weight = differences[-1], 0
+            gap = location - locations[-1]
+            weights[-1] = gap
+            self.totals[block] += gap
+            self.histograms[block][difference] += gap
+            self.non_negative[block] += gap
+        else:
+            # The gap is split between the previous location and this one, both with the same D
+            difference = differences[position - 1]
+            weight = locations[position - 1] + weights[position - 1] - location
+            weights[position - 1] -= weight
+        locations.insert(position, location)
+        differences.insert(position, difference)
+        weights.insert(position, weight)
+        if len(locations) > 2 * self.block:
+            self._split(block)
+
+    def _split(self, block: int):
+        half = len(self.locations[block]) // 2
+        for blocks in (self.locations, self.differences, self.weights):
+            blocks.insert(block + 1, blocks[block][half:])
+            del blocks[block][half:]
+        self.firsts.insert(block + 1, self.locations[block + 1][0])
+        self.lazy.insert(block + 1, self.lazy[block])
+        for summaries in (self.totals, self.histograms, self.non_negative):
+            summaries.insert(block + 1, None)
+        self._summarise(block)
+        self._summarise(block + 1)
+
+    def _add_between(self, start: int, stop: int, change: int):
+        """Add change, 1 or -1, to D at every location from start up to stop, both already in the index"""
+        first = bisect_right(self.firsts, start) - 1
+        last = bisect_right(self.firsts, stop) - 1
+        start_position = bisect_left(self.locations[first], start)
+        stop_position = bisect_left(self.locations[last], stop)
+        if first == last:
+            self._add_cells(first, start_position, stop_position, change)
+            return
+        self._add_cells(first, start_position, len(self.locations[first]), change)
+        histograms, lazy, non_negative, totals = self.histograms, self.lazy, self.non_negative, self.totals
+        distance = self.distance
+        for whole in range(first + 1, last):
+            if change > 0:
+                distance += 2 * non_negative[whole] - totals[whole]
+                lazy[whole] += 1
+                non_negative[whole] += histograms[whole][-lazy[whole]]
+            else:
+                zeros = histograms[whole][-lazy[whole]]
+                distance += totals[whole] - 2 * (non_negative[whole] - zeros)
+                lazy[whole] -= 1
+                non_negative[whole] -= zeros
+        self.distance = distance
+        self._add_cells(last, 0, stop_position, change)
+
+    def _add_cells(self, block: int, start: int, stop: int, change: int):
+        """Add change to D one location at a time, positions start up to stop of block"""
+        differences, weights = self.differences[block], self.weights[block]
+        histogram, offset = self.histograms[block], self.lazy[block]
+        distance, non_negative = 0, 0
+        for position in range(start, stop):
+            before = differences[position]
+            after = differences[position] = before + change
+            weight = weights[position]
+            histogram[before] -= weight
+            histogram[after] += weight
+            distance += (abs(after + offset) - abs(before + offset)) * weight
+            non_negative += ((after + offset >= 0) - (before + offset >= 0)) * weight
+        self.distance += distance
+        self.non_negative[block] += non_negative
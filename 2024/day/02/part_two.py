@@ -1,6 +1,7 @@
 #!/usr/bin/python3
+import os
 
-from shared import data
-
-print(len([report for report in data() if report.potentially_safe]))
+from shared import count_in_file, count_potentially_safe, input_path
 
+if __name__ == "__main__":
+    print(count_in_file(input_path(), count_potentially_safe, workers=os.cpu_count()))
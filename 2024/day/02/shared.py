@@ -1,23 +1,41 @@
+import warnings
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from itertools import pairwise
+from itertools import pairwise, repeat
 from pathlib import Path
+from typing import Callable
 
+try:
+    import numpy
+except ImportError:  # NumPy is optional, reports are then scored one at a time
+    numpy = None
 
-@dataclass
+# A safe step between levels is this many or more, up to MAX_STEP, in one direction
+MIN_STEP = 1
+MAX_STEP = 3
+# Input bytes scored per chunk when a file is split across processes
+CHUNK_BYTES = 1 << 24
+
+
+@dataclass(slots=True)
 class Report:
-    levels: list[int]
+    levels: array
 
     @classmethod
     def from_line(cls, line: str):
         """
         >>> Report.from_line("1 2 3")
-        Report(levels=[1, 2, 3])
+        Report(levels=array('q', [1, 2, 3]))
+        >>> Report.from_line("3000000000 3000000001").safe
+        True
         """
-        return cls(levels=list(map(int, line.split())))
+        # 64 bit levels, as wide as the int64 ones of Reports
+        return cls(levels=array("q", map(int, line.split())))
 
     @property
     def safe(self) -> bool:
-        return (self.increasing or self.decreasing) and self.are_differences_bounded(min_value=1, max_value=3)
+        return (self.increasing or self.decreasing) and self.are_differences_bounded(min_value=MIN_STEP, max_value=MAX_STEP)
 
     @property
     def potentially_safe(self) -> bool:
@@ -35,13 +53,33 @@ class Report:
         >>> Report.from_line("1 3 6 7 9").potentially_safe
         True
         """
-        if self.safe:
-            return True
-        for i in range(len(self.levels)):
-            if Report(self.levels[:i] + self.levels[i + 1:]).safe:
+        for direction in (1, -1):
+            violation = self._violation(direction)
+            if violation is None:
+                return True
+            # Whatever the removal, the level before the violation or the violating one has to go
+            if self._violation(direction, skip=violation - 1) is None or self._violation(direction, skip=violation) is None:
                 return True
         return False
 
+    def _violation(self, direction: int, skip: int | None = None) -> int | None:
+        """
+        Index of the first level not 1 to 3 above, times direction, the previous level kept, leaving out skip
+
+        >>> Report.from_line("1 3 2 4 5")._violation(1)
+        2
+        >>> Report.from_line("1 3 2 4 5")._violation(1, skip=1) is None
+        True
+        """
+        previous = None
+        for index, level in enumerate(self.levels):
+            if index == skip:
+                continue
+            if previous is not None and not MIN_STEP <= (level - previous) * direction <= MAX_STEP:
+                return index
+            previous = level
+        return None
+
     @property
     def decreasing(self) -> bool:
         """
@@ -78,8 +116,174 @@ class Report:
         return all(map(lambda a: min_value <= a <= max_value, self.differences))
 
 
-def data(stem="input.txt"):
-    input_path = Path(__file__).parent / stem
-    with open(input_path) as open_file:
-        for line in open_file:
-            yield Report.from_line(line)
+def input_path(stem="input.txt") -> Path:
+    return Path(__file__).parent / stem
+
+
+def count_in_file(path: Path, counter: Callable[[bytes], int], workers: int = 1, chunk_bytes: int = CHUNK_BYTES) -> int:
+    """
+    Split the file into chunks of whole lines, count each with counter, count_safe or count_potentially_safe,
+    in a pool of workers processes and add the counts up. A file of one chunk is counted right here.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as directory:
+    ...     path = Path(directory) / "input.txt"
+    ...     _ = path.write_bytes(b"7 6 4 2 1\\n1 2 7 8 9\\n9 7 6 2 1\\n1 3 2 4 5\\n8 6 4 4 1\\n1 3 6 7 9\\n")
+    ...     print(count_in_file(path, count_safe, workers=2, chunk_bytes=8), count_in_file(path, count_potentially_safe))
+    2 4
+    >>> with tempfile.TemporaryDirectory() as directory:
+    ...     path = Path(directory) / "input.txt"
+    ...     _ = path.write_bytes(b"1 2\\n\\n")
+    ...     print(count_in_file(path, count_safe, chunk_bytes=4), count_in_file(path, count_safe))
+    1 1
+    """
+    ranges = _line_ranges(path, chunk_bytes)
+    if workers == 1 or len(ranges) == 1:
+        return sum(_count_range(path, start, stop, counter) for start, stop in ranges)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(_count_range, repeat(path), *zip(*ranges), repeat(counter)))
+
+
+def _line_ranges(path: Path, chunk_bytes: int) -> list[tuple[int, int]]:
+    """
+    Byte ranges of about chunk_bytes each, every one moved on to the start of the next line
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as directory:
+    ...     path = Path(directory) / "input.txt"
+    ...     _ = path.write_bytes(b"1 2\\n3 4 5\\n6\\n")
+    ...     print(_line_ranges(path, 4), _line_ranges(path, 100))
+    [(0, 4), (4, 10), (10, 12)] [(0, 12)]
+    """
+    size = path.stat().st_size
+    boundaries = [0]
+    with path.open("rb") as open_file:
+        for nominal in range(chunk_bytes, size, chunk_bytes):
+            if nominal <= boundaries[-1]:
+                continue
+            open_file.seek(nominal - 1)
+            open_file.readline()
+            if boundaries[-1] < open_file.tell() < size:
+                boundaries.append(open_file.tell())
+    boundaries.append(size)
+    return list(pairwise(boundaries))
+
+
+def _count_range(path: Path, start: int, stop: int, counter: Callable[[bytes], int]) -> int:
+    with path.open("rb") as open_file:
+        open_file.seek(start)
+        chunk = open_file.read(stop - start)
+    # Blank lines can make up a whole range, they hold no reports
+    return counter(chunk) if chunk.strip() else 0
+
+
+def count_safe(report_text: bytes) -> int:
+    """
+    >>> count_safe(b"7 6 4 2 1\\n1 2 7 8 9\\n9 7 6 2 1\\n1 3 2 4 5\\n8 6 4 4 1\\n1 3 6 7 9\\n")
+    2
+    """
+    if numpy is not None:
+        return int(Reports.from_text(report_text).safe().sum())
+    return sum(report.safe for report in _reports(report_text))
+
+
+def count_potentially_safe(report_text: bytes) -> int:
+    """
+    >>> count_potentially_safe(b"7 6 4 2 1\\n1 2 7 8 9\\n9 7 6 2 1\\n1 3 2 4 5\\n8 6 4 4 1\\n1 3 6 7 9\\n")
+    4
+    """
+    if numpy is not None:
+        return int(Reports.from_text(report_text).potentially_safe().sum())
+    return sum(report.potentially_safe for report in _reports(report_text))
+
+
+def _reports(report_text: bytes):
+    return (Report.from_line(line) for line in report_text.decode().splitlines() if line.strip())
+
+
+@dataclass
+class Reports:
+    """
+    Every report at once, one row of levels each, padded on the right up to the longest.
+    Safety is judged for all rows together with NumPy, lengths tells the real levels from padding.
+    """
+    levels: "numpy.ndarray"
+    lengths: "numpy.ndarray"
+
+    @classmethod
+    def from_text(cls, report_text: bytes) -> "Reports":
+        """
+        >>> reports = Reports.from_text(b"1 2 3\\n\\n40 5\\n")
+        >>> reports.levels.tolist(), reports.lengths.tolist()
+        ([[1, 2, 3], [40, 5, 0]], [3, 2])
+        >>> Reports.from_text(b" \\n").lengths.tolist()
+        []
+        """
+        raw = numpy.frombuffer(report_text, dtype=numpy.uint8)
+        # Bytes up to the space are whitespace, a level starts wherever one is followed by anything else
+        in_level = raw > ord(" ")
+        starts = numpy.flatnonzero(in_level[1:] & ~in_level[:-1]) + 1
+        if len(raw) and in_level[0]:
+            starts = numpy.concatenate(([0], starts))
+        if not len(starts):
+            return cls(numpy.zeros((0, 0), dtype=numpy.int64), numpy.zeros(0, dtype=numpy.intp))
+        # As in day 1's _parse_numpy, which explains both guards, days stay standalone rather than share it
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            try:
+                values = numpy.fromstring(report_text, dtype=numpy.int64, sep=" ")
+            except (DeprecationWarning, ValueError):
+                raise ValueError("Levels must be whitespace separated ints") from None
+        if len(starts) != len(values):
+            raise ValueError("Levels must be whitespace separated ints")
+        lines = numpy.cumsum(raw == ord("\n"), dtype=numpy.int32)[starts]
+        rows = numpy.concatenate(([0], numpy.cumsum(numpy.diff(lines) != 0))) if len(lines) else lines
+        lengths = numpy.bincount(rows)
+        columns = numpy.arange(len(values)) - (numpy.cumsum(lengths) - lengths)[rows]
+        levels = numpy.zeros((len(lengths), int(lengths.max(initial=0))), dtype=numpy.int64)
+        levels[rows, columns] = values
+        return cls(levels, lengths)
+
+    def safe(self) -> "numpy.ndarray":
+        """
+        >>> Reports.from_text(b"7 6 4 2 1\\n1 2 7 8 9\\n5\\n").safe().tolist()
+        [True, False, True]
+        """
+        good = self._good_steps()
+        return good.all(axis=2).any(axis=0)
+
+    def potentially_safe(self) -> "numpy.ndarray":
+        """
+        Removing level k leaves the steps before k - 1, the step from k - 1 to k + 1 and the steps after k.
+        Prefix and suffix runs of good steps answer the first and last for every k at once.
+
+        >>> Reports.from_text(b"9 7 6 2 1\\n1 3 2 4 5\\n8 6 4 4 1\\n1 3 6 7 9\\n9 1 2\\n1 2 3 9\\n").potentially_safe().tolist()
+        [False, True, True, True, True, True]
+        """
+        count, width = self.levels.shape
+        good = self._good_steps()
+        steps = good.shape[2]
+        # before[..., j] holds when steps 0 to j - 1 are all good, after[..., j] when steps j onwards are
+        before = numpy.ones((2, count, steps + 1), dtype=bool)
+        numpy.logical_and.accumulate(good, axis=2, out=before[..., 1:])
+        after = numpy.ones((2, count, steps + 2), dtype=bool)
+        after[..., :steps] = numpy.logical_and.accumulate(good[..., ::-1], axis=2)[..., ::-1]
+        result = good.all(axis=2).any(axis=0)
+        for removed in range(width):
+            kept = before[..., max(removed - 1, 0)] & after[..., removed + 1]
+            if 0 < removed < width - 1:
+                bridge = self.levels[:, removed + 1] - self.levels[:, removed - 1]
+                bridged = (removed + 1 >= self.lengths) | _in_step(numpy.stack((bridge, -bridge)))
+                kept &= bridged
+            result |= (removed < self.lengths) & kept.any(axis=0)
+        return result
+
+    def _good_steps(self) -> "numpy.ndarray":
+        """Per direction, increasing then decreasing, whether each step is safe, padding counting as safe"""
+        differences = numpy.diff(self.levels, axis=1)
+        padding = numpy.arange(differences.shape[1]) >= (self.lengths - 1)[:, None]
+        return _in_step(numpy.stack((differences, -differences))) | padding
+
+
+def _in_step(differences: "numpy.ndarray") -> "numpy.ndarray":
+    return (differences >= MIN_STEP) & (differences <= MAX_STEP)
@@ -4,12 +4,4 @@ from shared import data
 
 grid: Grid = data()
 
-xs = filter(lambda cell: cell.content == "X", grid)
-
-xmas_count = 0
-
-for x in xs:
-    words = list(grid.words(x.position, 4))
-    xmas_count += len(list(filter(lambda word: word == "XMAS", words)))
-
-print(xmas_count)
+print(grid.count_word("XMAS"))
@@ -5,4 +5,4 @@ from lib.grid import Grid
 
 def data(stem="input.txt"):
     input_path = Path(__file__).parent / stem
-    return Grid.from_file(input_path)
+    return Grid.cached(input_path)
@@ -1,12 +1,28 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
 import operator
-from dataclasses import dataclass
+import struct
+import sys
+import tempfile
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
 from enum import Enum
-from functools import reduce
+from functools import cached_property, partial, reduce
+from itertools import chain, repeat
 from pathlib import Path
-from typing import TypeVar, Generic, Callable, Generator, Iterable
+from typing import TypeVar, Generic, Callable, Generator, Iterable, Sequence
 
 from lib.protocol import Addable
 
+try:
+    import numpy
+except ImportError:  # NumPy is optional, the pure Python paths are used without it
+    numpy = None
+
 T = TypeVar("T", bound=Addable)
 
 
@@ -14,6 +30,14 @@ class BoundsError(ValueError):
     """Raise when a position isn't bounded"""
 
 
+# Saved grids start with magic, version, kind ("s" for ASCII text or an array typecode), byte order, width and height
+SAVED_HEADER = struct.Struct("<4sBccII")
+SAVED_MAGIC = b"GRID"
+SAVED_VERSION = 1
+# Inputs are hashed this many bytes at a time
+HASH_CHUNK = 1 << 20
+
+
 UP = -1
 DOWN = 1
 LEFT = -1
@@ -28,8 +52,19 @@ alpha_iterables = [
 ]
 
 
-@dataclass
+PACK_BITS = 32
+
+_DIGIT_VALUES = bytes.maketrans(b"0123456789", bytes(range(10)))
+
+
+@dataclass(frozen=True, slots=True)
 class Position:
+    """
+    Immutable and hashable, so positions can be set members and dict keys
+
+    >>> {Position(1, 2), Position(1, 2)}
+    {Position(x=1, y=2)}
+    """
     x: int
     y: int
 
@@ -38,11 +73,29 @@ class Position:
 
     def offset(self, direction: "Direction", length: int) -> "Position":
         new_position = Position(
-            x=self.x + (length * direction.value.x),
-            y=self.y + (length * direction.value.y),
+            self.x + length * direction.dx,
+            self.y + length * direction.dy,
         )
         return new_position
 
+    def pack(self) -> int:
+        """
+        Encode both coordinates in one int, each coordinate must fit in a signed PACK_BITS integer
+
+        >>> Position(-3, 2).pack()
+        8589934589
+        >>> Position.unpack(Position(-3, 2).pack())
+        Position(x=-3, y=2)
+        >>> Position.unpack(Position(5, -1).pack())
+        Position(x=5, y=-1)
+        """
+        return (self.y << PACK_BITS) + self.x
+
+    @classmethod
+    def unpack(cls, packed: int) -> "Position":
+        y = (packed + (1 << (PACK_BITS - 1))) >> PACK_BITS
+        return cls(packed - (y << PACK_BITS), y)
+
 
 class Direction(Enum):
     N = Position(0, UP)
@@ -54,13 +107,157 @@ class Direction(Enum):
     W = Position(LEFT, 0)
     NW = Position(LEFT, UP)
 
+    def __init__(self, delta: Position):
+        # Plain attributes, reading them skips the Enum.value descriptor on hot paths
+        self.dx = delta.x
+        self.dy = delta.y
 
-@dataclass
+    @property
+    def opposite(self) -> "Direction":
+        """
+        >>> Direction.NE.opposite
+        <Direction.SW: Position(x=-1, y=1)>
+        """
+        return Direction(Position(-self.dx, -self.dy))
+
+
+CARDINALS = (Direction.N, Direction.E, Direction.S, Direction.W)
+NO_COMPONENT = -1
+
+
+class MappedText(Sequence[str]):
+    """Read only str access to the bytes of a memory mapped ASCII file"""
+
+    def __init__(self, mapped: mmap.mmap):
+        self.mapped = mapped
+
+    def __len__(self) -> int:
+        return len(self.mapped)
+
+    def __getitem__(self, item: int | slice) -> str:
+        if isinstance(item, slice):
+            return self.mapped[item].decode("ascii")
+        return chr(self.mapped[item])
+
+    def __repr__(self) -> str:
+        return f"MappedText(length={len(self)})"
+
+
+class RowContents(Sequence[T]):
+    """
+    Flat contents kept as separate rows so snapshots can share them, copy on write.
+    A row is copied the first time it's written after a snapshot, every write marks its row dirty.
+    """
+
+    def __init__(self, rows: list[Sequence[T]], width: int):
+        self.rows = rows
+        self.width = width
+        self.owned = set()
+        self.dirty = set()
+
+    def __len__(self) -> int:
+        return len(self.rows) * self.width
+
+    def __getitem__(self, item: int | slice) -> T | Sequence[T]:
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            y, x = divmod(start, self.width)
+            if step == 1 and stop - start <= self.width - x:
+                return self.rows[y][x:x + stop - start]
+            return _join(self.rows[0], [[self[index] for index in range(start, stop, step)]])
+        y, x = divmod(item, self.width)
+        return self.rows[y][x]
+
+    def __setitem__(self, index: int, content: T):
+        y, x = divmod(index, self.width)
+        if y not in self.owned:
+            self.rows[y] = self.rows[y][:]
+            self.owned.add(y)
+        self.rows[y][x] = content
+        self.dirty.add(y)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RowContents):
+            return NotImplemented
+        return self.width == other.width and len(self.rows) == len(other.rows) and all(
+            mine is theirs or mine == theirs for mine, theirs in zip(self.rows, other.rows)
+        )
+
+    def __repr__(self) -> str:
+        return f"RowContents(rows={len(self.rows)}, width={self.width}, dirty={sorted(self.dirty)})"
+
+    def snapshot(self) -> "RowContents[T]":
+        """Share every row, neither side owns them anymore so the next write to a row copies it"""
+        self.owned = set()
+        return RowContents(list(self.rows), self.width)
+
+    def clear_dirty(self) -> list[int]:
+        """The rows written since the last call, sorted"""
+        dirty, self.dirty = sorted(self.dirty), set()
+        return dirty
+
+
+@dataclass(slots=True)
 class Cell(Generic[T]):
     position: Position
     content: T
 
 
+@dataclass(frozen=True, slots=True)
+class Line:
+    """A full row, column or diagonal of a text grid, read in one direction"""
+    text: str
+    start: Position
+    direction: Direction
+
+    def position(self, index: int) -> Position:
+        return self.start.offset(self.direction, index)
+
+
+@dataclass(frozen=True)
+class Adjacency:
+    """Compressed sparse rows, the neighbours of cell id i are indices[offsets[i]:offsets[i + 1]]"""
+    offsets: array
+    indices: array
+
+    def neighbours(self, cell_id: int) -> array:
+        return self.indices[self.offsets[cell_id]:self.offsets[cell_id + 1]]
+
+
+@dataclass(frozen=True)
+class Components:
+    """
+    A label for every cell id, y * width + x, NO_COMPONENT where the predicate didn't hold.
+    sizes and boxes are indexed by label, a box is its top left and bottom right positions.
+    """
+    width: int
+    labels: array
+    sizes: list[int]
+    boxes: list[tuple[Position, Position]]
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def label(self, position: Position) -> int | None:
+        if not (0 <= position.x < self.width and 0 <= position.y * self.width < len(self.labels)):
+            raise BoundsError(f"Position {position} is outside the grid")
+        label = self.labels[position.y * self.width + position.x]
+        return None if label == NO_COMPONENT else label
+
+    def positions(self, label: int) -> list[Position]:
+        return [
+            Position(cell_id % self.width, cell_id // self.width)
+            for cell_id, other in enumerate(self.labels)
+            if other == label
+        ]
+
+
+@dataclass(slots=True)
+class TiledCell(Cell[T]):
+    """A cell of a wrapping grid, position is within the grid and tile counts the repetitions away from it"""
+    tile: Position
+
+
 @dataclass
 class Grid(Generic[T]):
     """
@@ -68,44 +265,851 @@ class Grid(Generic[T]):
     y=0 ...
         ...
         ...
+
+    Contents are stored row by row in one flat sequence, the content at (x, y)
+    lives at index start + y * stride + x. Cells are only created when handed out.
+    A grid whose start and stride differ from 0 and width is a view sharing the
+    contents of a bigger grid. With wrap the grid repeats infinitely in every direction,
+    at(), offset(), word(), words(), in_bounds() and set() then accept any position and
+    neighbours connect across the edges. lines(), find_all(), count_word(), match_pattern()
+    and the bitboard shifts would go on forever or silently stop at the edges, so they raise ValueError.
+    Views share edits, a count of set() calls on their contents, so each view's caches notice writes made through another.
     """
     width: int
     height: int
-    cells: list[list[Cell[T]]]
+    contents: Sequence[T]
+    start: int = 0
+    stride: int | None = None
+    wrap: bool = False
+    edits: list[int] = field(default_factory=lambda: [0], repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.stride is None:
+            self.stride = self.width
+        if self.wrap and not (self.width and self.height):
+            raise ValueError("A wrapping grid needs at least one cell")
 
     def __iter__(self):
-        for row in self.cells:
-            for cell in row:
-                yield cell
+        for y, row in enumerate(self.rows()):
+            for x, content in enumerate(row):
+                yield Cell(Position(x, y), content)
+
+    def index(self, position: Position) -> int:
+        """
+        >>> Grid.from_iterables(alpha_iterables).index(Position(2,1))
+        7
+        """
+        return self.start + position.y * self.stride + position.x
 
-    def sub_grid(self, position: Position, dimensions: Position):
-        return Grid(width=dimensions.x, height=dimensions.y, cells=[
-            row[position.x:position.x + dimensions.x]
-            for row in self.cells[position.y:position.y + dimensions.y]
-        ])
+    def position(self, index: int) -> Position:
+        """
+        >>> Grid.from_iterables(alpha_iterables).position(7)
+        Position(x=2, y=1)
+        """
+        y, x = divmod(index - self.start, self.stride)
+        return Position(x, y)
+
+    def rows(self) -> Generator[Sequence[T], None, None]:
+        for start in range(self.start, self.start + self.height * self.stride, self.stride):
+            yield self.contents[start:start + self.width]
+
+    def sub_grid(self, position: Position, dimensions: Position) -> "Grid[T]":
+        """
+        A view sharing this grid's contents, use copy() to detach it
+
+        >>> grid = Grid.from_iterables(alpha_iterables)
+        >>> sub_grid = grid.sub_grid(Position(1,1), Position(2,3))
+        >>> sub_grid.print()
+        GH
+        LM
+        NO
+        >>> sub_grid.contents is grid.contents
+        True
+        >>> sub_grid.at(Position(1,0)).content
+        'H'
+        >>> sub_grid.word(Position(0,0), Direction.SE, 2)
+        'GM'
+        >>> grid.sub_grid(Position(4,4), Position(2,2))
+        Traceback (most recent call last):
+        ...
+        lib.grid.BoundsError: Position Position(x=5, y=5) is outside the grid
+        """
+        corner = Position(position.x + dimensions.x - 1, position.y + dimensions.y - 1)
+        for bound in (position, corner):
+            if not (0 <= bound.x < self.width and 0 <= bound.y < self.height):
+                raise BoundsError(f"Position {bound} is outside the grid")
+        return Grid(
+            width=dimensions.x,
+            height=dimensions.y,
+            contents=self.contents,
+            start=self.index(position),
+            stride=self.stride,
+            edits=self.edits,
+        )
+
+    def tiled(self) -> "Grid[T]":
+        """
+        A wrapping view of this grid sharing its contents
+
+        >>> grid = Grid.from_iterables(["AB", "CD"])
+        >>> grid.tiled().offset(Position(0,0), Direction.NW, 3).content
+        'D'
+        >>> grid.tiled().contents is grid.contents
+        True
+        >>> Grid.from_iterables([]).tiled()
+        Traceback (most recent call last):
+        ...
+        ValueError: A wrapping grid needs at least one cell
+        """
+        return replace(self, wrap=True)
+
+    def copy(self) -> "Grid[T]":
+        """
+        >>> sub_grid = Grid.from_iterables(alpha_iterables).sub_grid(Position(1,1), Position(2,2))
+        >>> sub_grid.copy()
+        Grid(width=2, height=2, contents='GHLM', start=0, stride=2, wrap=False)
+        """
+        return Grid(width=self.width, height=self.height, contents=_join(self.contents, self.rows()), wrap=self.wrap)
+
+    def mutable(self) -> "Grid[T]":
+        """
+        A copy whose rows are stored apart, so set() works on text too and snapshot() is cheap.
+        Text rows become lists of characters.
+
+        >>> grid = Grid.from_iterables(["#.", ".."]).mutable()
+        >>> grid.set(Position(1,1), "#")
+        >>> grid.print()
+        #.
+        .#
+        >>> grid.contents.clear_dirty()
+        [1]
+        """
+        rows = [list(row) if isinstance(row, str) else row[:] for row in self.rows()]
+        return Grid(width=self.width, height=self.height, contents=RowContents(rows, self.width), wrap=self.wrap)
+
+    def snapshot(self) -> "Grid[T]":
+        """
+        A copy of a mutable grid that shares its rows until either side writes to one
+
+        >>> grid = Grid.from_iterables(["#.", ".."]).mutable()
+        >>> before = grid.snapshot()
+        >>> grid.set(Position(0,1), "#")
+        >>> before.contents.rows[0] is grid.contents.rows[0], before.contents.rows[1] is grid.contents.rows[1]
+        (True, False)
+        >>> before.print()
+        #.
+        ..
+        >>> before == grid, grid.snapshot() == grid
+        (False, True)
+        """
+        if not isinstance(self.contents, RowContents) or (self.start, self.stride) != (0, self.width):
+            raise ValueError("Only whole grids made with mutable() can be snapshot")
+        return replace(self, contents=self.contents.snapshot(), edits=[0])
 
     def print(self):
-        for row in self.cells:
-            print("".join([cell.content for cell in row]))
+        for row in self.rows():
+            print("".join(map(str, row)))
+
+    def save(self, path: Path):
+        """
+        Write a header then the raw contents, ASCII text or the bytes of an array.
+        The file is written aside and renamed, readers never see it half written.
+
+        >>> import tempfile
+        >>> with tempfile.TemporaryDirectory() as directory:
+        ...     for grid in (Grid.from_iterables(["ABC", "DEF"]), Grid.from_digits(["123", "456"], "i")):
+        ...         grid.sub_grid(Position(1,0), Position(2,2)).save(Path(directory) / "grid")
+        ...         loaded = Grid.load(Path(directory) / "grid")
+        ...         print(loaded.width, loaded.height, list(loaded.rows()))
+        2 2 ['BC', 'EF']
+        2 2 [array('i', [2, 3]), array('i', [5, 6])]
+        >>> Grid.from_iterables(["12"], int).save(Path("unused"))
+        Traceback (most recent call last):
+        ...
+        ValueError: Only text and array grids can be saved, not list
+        """
+        contents = _join(self.contents, self.rows())
+        if isinstance(contents, str) and contents.isascii():
+            kind, raw = b"s", contents.encode("ascii")
+        elif isinstance(contents, array):
+            kind, raw = contents.typecode.encode(), contents.tobytes()
+        else:
+            raise ValueError(f"Only text and array grids can be saved, not {type(contents).__name__}")
+        header = SAVED_HEADER.pack(SAVED_MAGIC, SAVED_VERSION, kind, sys.byteorder[0].encode(), self.width, self.height)
+        # A name of its own, so processes saving the same grid at once don't write into each other's file
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False) as open_file:
+            written = Path(open_file.name)
+            try:
+                open_file.write(header)
+                open_file.write(raw)
+            except BaseException:
+                written.unlink()
+                raise
+        written.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "Grid":
+        """
+        Read a grid written by save(). Text is served from the mapped file,
+        arrays are copied in with one read, nothing is parsed cell by cell.
+
+        >>> with tempfile.TemporaryDirectory() as directory:
+        ...     path = Path(directory) / "grid"
+        ...     Grid.from_iterables(["ABC", "DEF"]).save(path)
+        ...     _ = path.write_bytes(path.read_bytes()[:-1])
+        ...     try:
+        ...         Grid.load(path)
+        ...     except ValueError as error:
+        ...         print(str(error).replace(str(path), "grid"))
+        grid holds 5 bytes of cells, expected 6
+        """
+        with path.open("rb") as open_file:
+            mapped = mmap.mmap(open_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < SAVED_HEADER.size:
+            mapped.close()
+            raise ValueError(f"{path} is too short to be a saved grid")
+        magic, version, kind, byte_order, width, height = SAVED_HEADER.unpack_from(mapped)
+        if magic != SAVED_MAGIC or version != SAVED_VERSION:
+            mapped.close()
+            raise ValueError(f"{path} isn't a version {SAVED_VERSION} saved grid")
+        size, item_size = len(mapped) - SAVED_HEADER.size, 1 if kind == b"s" else array(kind.decode()).itemsize
+        if size != width * height * item_size:
+            mapped.close()
+            raise ValueError(f"{path} holds {size} bytes of cells, expected {width * height * item_size}")
+        if kind == b"s":
+            return cls(width=width, height=height, contents=MappedText(mapped), start=SAVED_HEADER.size)
+        contents = array(kind.decode())
+        contents.frombytes(mapped[SAVED_HEADER.size:])
+        mapped.close()
+        if byte_order.decode() != sys.byteorder[0]:
+            contents.byteswap()
+        return cls(width=width, height=height, contents=contents)
+
+    @classmethod
+    def cached(
+            cls,
+            path: Path,
+            parse: Callable[[Path], "Grid"] | None = None,
+            directory: Path | None = None,
+            key: str | None = None,
+    ) -> "Grid":
+        """
+        Parse path once and keep the grid saved, keyed by a hash of the file and key,
+        which defaults to the parser's module and qualified name. Lambdas, partials and
+        other parsers without a name of their own need an explicit key.
+        Later calls with the same input load the saved grid instead, from directory,
+        which defaults to .grid_cache next to the input.
+        The cache only ever saves work: grids that can't be saved, or saved where the
+        directory can't be written, are parsed every time, and a damaged saved grid is parsed again.
+
+        >>> import tempfile
+        >>> with tempfile.TemporaryDirectory() as directory:
+        ...     path = Path(directory) / "input.txt"
+        ...     _ = path.write_text("123\\n456\\n")
+        ...     first = Grid.cached(path, Grid.of_ints)
+        ...     second = Grid.cached(path, Grid.of_ints)
+        ...     print(first.contents, second.contents, len(list((Path(directory) / ".grid_cache").iterdir())))
+        array('b', [1, 2, 3, 4, 5, 6]) array('b', [1, 2, 3, 4, 5, 6]) 1
+        >>> Grid.cached(Path("unused"), lambda path: Grid.from_file(path))
+        Traceback (most recent call last):
+        ...
+        ValueError: Pass a key to cache grids parsed by <lambda>
+        >>> with tempfile.TemporaryDirectory() as directory:
+        ...     path = Path(directory) / "input.txt"
+        ...     _ = path.write_text("123\\n456\\n")
+        ...     _ = (Path(directory) / ".grid_cache").write_text("not a directory")
+        ...     print(Grid.cached(path, Grid.of_ints).contents)
+        array('b', [1, 2, 3, 4, 5, 6])
+        """
+        parse = parse or cls.from_file
+        if key is None:
+            name = getattr(parse, "__qualname__", None)
+            if name is None or "<" in name:
+                raise ValueError(f"Pass a key to cache grids parsed by {name or type(parse).__name__}")
+            key = f"{parse.__module__}.{name}"
+        digest = hashlib.sha256()
+        with path.open("rb") as open_file:
+            while chunk := open_file.read(HASH_CHUNK):
+                digest.update(chunk)
+        digest.update(key.encode())
+        directory = directory or path.parent / ".grid_cache"
+        saved = directory / f"{digest.hexdigest()}.grid"
+        if saved.exists():
+            try:
+                return cls.load(saved)
+            except (OSError, ValueError):
+                pass
+        grid = parse(path)
+        try:
+            directory.mkdir(exist_ok=True)
+            grid.save(saved)
+        except (OSError, ValueError):
+            pass
+        return grid
 
     @classmethod
     def from_file(cls, path: Path, func: Callable[[str], T] = str) -> "Grid[T]":
+        """
+        One row per line, without its line ending, as in from_mmap
+
+        >>> import tempfile
+        >>> with tempfile.TemporaryDirectory() as directory:
+        ...     path = Path(directory) / "grid.txt"
+        ...     _ = path.write_bytes(b"ABC\\r\\nDEF\\r\\n")
+        ...     grid = Grid.from_file(path)
+        ...     print(grid.width, grid.height, list(grid.rows()))
+        3 2 ['ABC', 'DEF']
+        """
         with path.open() as open_file:
-            return cls.from_iterables(open_file, func)
+            return cls.from_iterables((line.rstrip("\r\n") for line in open_file), func)
+
+    @classmethod
+    def from_mmap(cls, path: Path) -> "Grid[str]":
+        """
+        Serve the grid straight from the mapped file, each line being a row of the same width
+
+        >>> import tempfile
+        >>> with tempfile.TemporaryDirectory() as directory:
+        ...     path = Path(directory) / "grid.txt"
+        ...     for text in ("ABC\\nDEF\\n", "ABC\\nDEF", "ABC\\r\\nDEF\\r\\n"):
+        ...         _ = path.write_bytes(text.encode())
+        ...         grid = Grid.from_mmap(path)
+        ...         print(grid.width, grid.height, grid.at(Position(1,1)).content, grid.word(Position(2,1), Direction.NW, 2))
+        3 2 E FB
+        3 2 E FB
+        3 2 E FB
+        >>> with tempfile.TemporaryDirectory() as directory:
+        ...     path = Path(directory) / "grid.txt"
+        ...     for text in ("ABC\\nDEF\\n\\n", "ABC\\nDE\\n", "ABC\\nDEFG"):
+        ...         _ = path.write_bytes(text.encode())
+        ...         try:
+        ...             Grid.from_mmap(path)
+        ...         except ValueError as error:
+        ...             print(error)
+        Row 2 has 0 cells, expected 3
+        Row 1 has 2 cells, expected 3
+        Row 1 has 4 cells, expected 3
+        """
+        with path.open("rb") as open_file:
+            if path.stat().st_size == 0:
+                return cls(width=0, height=0, contents="")
+            mapped = mmap.mmap(open_file.fileno(), 0, access=mmap.ACCESS_READ)
+        width = mapped.find(b"\n")
+        if width == -1:
+            width = stride = len(mapped)
+        else:
+            stride = width + 1
+            if width and mapped[width - 1] == ord("\r"):
+                width -= 1
+        # Every row must hold width cells and its line ending, the last one may leave the ending off
+        ending = stride - width
+        height, row_start = 0, 0
+        while row_start < len(mapped):
+            row_end = mapped.find(b"\n", row_start)
+            next_start = len(mapped) if row_end == -1 else row_end + 1
+            cells = next_start - row_start - (0 if row_end == -1 else ending)
+            if cells != width:
+                mapped.close()
+                raise ValueError(f"Row {height} has {cells} cells, expected {width}")
+            height, row_start = height + 1, next_start
+        return cls(width=width, height=height, contents=MappedText(mapped), stride=stride)
+
+    @classmethod
+    def of_ints(cls, path: Path, typecode: str = "b") -> "Grid[int]":
+        """A grid of single digits, as found in heightmap puzzles, see from_digits"""
+        with path.open() as open_file:
+            return cls.from_digits((line.rstrip("\r\n") for line in open_file), typecode)
+
+    @classmethod
+    def from_digits(cls, lines: Iterable[str], typecode: str = "b") -> "Grid[int]":
+        """
+        Convert whole rows of digits at once into a compact array of the given typecode
+
+        >>> grid = Grid.from_digits(["123", "456"])
+        >>> grid.contents
+        array('b', [1, 2, 3, 4, 5, 6])
+        >>> grid.word(Position(0,0), Direction.SE, 2)
+        6
+        >>> grid.sub_grid(Position(1,0), Position(2,2)).copy().contents
+        array('b', [2, 3, 5, 6])
+        >>> Grid.from_digits(["12", "3."])
+        Traceback (most recent call last):
+        ...
+        ValueError: Row 1 isn't only digits: '3.'
+        """
+        digits = bytearray()
+        width, height = None, 0
+        for height, line in enumerate(lines, 1):
+            row = line.encode()
+            if not row.isdigit():
+                raise ValueError(f"Row {height - 1} isn't only digits: {line!r}")
+            if width is None:
+                width = len(row)
+            elif len(row) != width:
+                raise ValueError(f"Row {height - 1} has {len(row)} cells, expected {width}")
+            digits += row.translate(_DIGIT_VALUES)
+        contents = array(typecode)
+        if contents.itemsize == 1:
+            contents.frombytes(digits)
+        else:
+            contents.extend(digits)
+        return cls(width=width or 0, height=height, contents=contents)
 
     @classmethod
     def from_iterables(cls, iterables: Iterable[Iterable[T]], func: Callable[[str], T] = str) -> "Grid[T]":
-        lines = []
-        x, y = 0, 0
+        """
+        >>> grid = Grid.from_iterables(["12", "34"], int)
+        >>> grid.contents
+        [1, 2, 3, 4]
+        >>> Grid.from_iterables(["12", "345"])
+        Traceback (most recent call last):
+        ...
+        ValueError: Row 1 has 3 cells, expected 2
+        """
+        rows = []
+        width = None
         for y, line in enumerate(iterables):
-            cells = []
-            for x, char in enumerate(line):
-                cells.append(Cell(Position(x, y), func(char)))
-            lines.append(cells)
-        return Grid(width=x + 1, height=y + 1, cells=lines)
+            if func is str:
+                row = line if isinstance(line, str) else "".join(line)
+            else:
+                row = [func(char) for char in line]
+            if width is None:
+                width = len(row)
+            elif len(row) != width:
+                raise ValueError(f"Row {y} has {len(row)} cells, expected {width}")
+            rows.append(row)
+        return cls(width=width or 0, height=len(rows), contents=_join("" if func is str else [], rows))
 
     def in_bounds(self, position: Position) -> bool:
-        return position.is_bounded(0, 0, self.width - 1, self.height - 1)
+        """
+        >>> grid = Grid.from_iterables(["AB", "CD"])
+        >>> grid.in_bounds(Position(2, 0)), grid.tiled().in_bounds(Position(2, 0))
+        (False, True)
+        """
+        return self.wrap or (0 <= position.x < self.width and 0 <= position.y < self.height)
+
+    def _tile_position(self, position: Position) -> Position:
+        """The position within the grid, brought back into the first tile of a wrapping grid"""
+        if self.wrap:
+            return Position(position.x % self.width, position.y % self.height)
+        if not self.in_bounds(position):
+            raise BoundsError(f"Position {position} is outside the grid")
+        return position
+
+    @property
+    def content_index(self) -> dict[T, array]:
+        """
+        Every distinct content and the local indexes, y * width + x, holding it
+
+        >>> Grid.from_iterables(["ABA", "CAB"]).content_index
+        {'A': array('I', [0, 2, 4]), 'B': array('I', [1, 5]), 'C': array('I', [3])}
+        """
+        self._forget_stale_caches()
+        return self._content_index
+
+    @cached_property
+    def _content_index(self) -> dict[T, array]:
+        index = defaultdict(partial(array, "I"))
+        for local_index, content in enumerate(chain.from_iterable(self.rows())):
+            index[content].append(local_index)
+        return dict(index)
+
+    def positions_of(self, content: T) -> list[Position]:
+        """
+        >>> Grid.from_iterables(alpha_iterables).positions_of("M")
+        [Position(x=2, y=2), Position(x=0, y=3)]
+        >>> Grid.from_iterables(alpha_iterables).positions_of("Z")
+        []
+        """
+        width = self.width
+        return [Position(index % width, index // width) for index in self.content_index.get(content, ())]
+
+    def count_of(self, content: T) -> int:
+        """
+        >>> Grid.from_iterables(alpha_iterables).count_of("M")
+        2
+        """
+        return len(self.content_index.get(content, ()))
+
+    def set(self, position: Position, content: T):
+        """
+        Grids over mutable contents, such as lists, can be updated in place.
+        The caches of every view over the same contents are rebuilt on their next use.
+
+        >>> grid = Grid.from_iterables(["12", "34"], int)
+        >>> grid.count_of(1)
+        1
+        >>> grid.set(Position(1,1), 1)
+        >>> grid.count_of(1)
+        2
+        >>> grid.sub_grid(Position(0,1), Position(1,1)).set(Position(0,0), 1)
+        >>> grid.count_of(1)
+        3
+        >>> grid.tiled().set(Position(-1,-1), 5)
+        >>> grid.at(Position(1,1)).content
+        5
+        """
+        self.contents[self.index(self._tile_position(position))] = content
+        self.edits[0] += 1
+
+    def _forget_stale_caches(self):
+        """Clear the content caches when the contents were edited since they were built, through any view"""
+        if self.__dict__.get("_edits_seen") != self.edits[0]:
+            self._clear_content_caches()
+            self.__dict__["_edits_seen"] = self.edits[0]
+
+    def _clear_content_caches(self):
+        """Forget everything derived from the contents, it's rebuilt lazily on next use"""
+        self.__dict__.pop("_content_index", None)
+        self.__dict__.pop("_line_cache", None)
+        self.__dict__.pop("_bitboard_cache", None)
+
+    def adjacency(
+            self,
+            directions: Sequence[Direction] = CARDINALS,
+            passable: Callable[[T], bool] | None = None,
+    ) -> Adjacency:
+        """
+        The neighbours of every cell id, y * width + x, that are passable, built for the whole grid.
+        Nothing is cached, keep it and pass it to the searches that should share it.
+        Neighbours of a wrapping grid connect across its edges.
+
+        >>> grid = Grid.from_iterables(["..#", "#.."])
+        >>> adjacency = grid.adjacency(passable=lambda content: content != "#")
+        >>> adjacency.neighbours(1).tolist()
+        [4, 0]
+        >>> adjacency.neighbours(2).tolist()
+        [5, 1]
+        >>> grid.adjacency(list(Direction)).neighbours(0).tolist()
+        [1, 4, 3]
+        >>> grid.tiled().adjacency().neighbours(0).tolist()
+        [3, 1, 3, 2]
+        """
+        width, height = self.width, self.height
+        is_open = None if passable is None else bytearray(map(passable, chain.from_iterable(self.rows())))
+        if self.wrap:
+            neighbours = self._lazy_neighbours(directions, None if is_open is None else is_open.__getitem__)
+            offsets, indices = array("I", [0]), array("I")
+            for cell_id in range(width * height):
+                indices.extend(neighbours(cell_id))
+                offsets.append(len(indices))
+            return Adjacency(offsets, indices)
+        deltas = [(direction.dx, direction.dy, direction.dy * width + direction.dx) for direction in directions]
+        offsets, indices = array("I", [0]), array("I")
+        cell_id = 0
+        for y in range(height):
+            for x in range(width):
+                for dx, dy, step in deltas:
+                    if 0 <= x + dx < width and 0 <= y + dy < height and (is_open is None or is_open[cell_id + step]):
+                        indices.append(cell_id + step)
+                offsets.append(len(indices))
+                cell_id += 1
+        return Adjacency(offsets, indices)
+
+    def neighbour_function(
+            self,
+            directions: Sequence[Direction] = CARDINALS,
+            passable: Callable[[T], bool] | None = None,
+            adjacency: Adjacency | None = None,
+    ) -> Callable[[int], Sequence[int]]:
+        """
+        The passable neighbours of a cell id, read from adjacency when given,
+        otherwise worked out only for the cells that are asked about
+
+        >>> grid = Grid.from_iterables(["..#", "#.."])
+        >>> neighbours = grid.neighbour_function(passable=lambda content: content != "#")
+        >>> neighbours(1), neighbours(2)
+        ([4, 0], [5, 1])
+        >>> list(grid.neighbour_function(adjacency=grid.adjacency())(0))
+        [1, 3]
+        """
+        if adjacency is not None:
+            return adjacency.neighbours
+        if passable is None:
+            return self._lazy_neighbours(directions, None)
+        contents, start, stride, width = self.contents, self.start, self.stride, self.width
+        return self._lazy_neighbours(
+            directions, lambda cell_id: passable(contents[start + cell_id // width * stride + cell_id % width])
+        )
+
+    def _lazy_neighbours(
+            self,
+            directions: Sequence[Direction],
+            is_open: Callable[[int], bool] | None,
+    ) -> Callable[[int], list[int]]:
+        width, height = self.width, self.height
+        deltas = [(direction.dx, direction.dy, direction.dy * width + direction.dx) for direction in directions]
+
+        if self.wrap:
+            def neighbours(cell_id: int) -> list[int]:
+                y, x = divmod(cell_id, width)
+                wrapped = ((y + dy) % height * width + (x + dx) % width for dx, dy, _ in deltas)
+                return [neighbour for neighbour in wrapped if is_open is None or is_open(neighbour)]
+
+            return neighbours
+
+        def neighbours(cell_id: int) -> list[int]:
+            y, x = divmod(cell_id, width)
+            return [
+                cell_id + step
+                for dx, dy, step in deltas
+                if 0 <= x + dx < width and 0 <= y + dy < height and (is_open is None or is_open(cell_id + step))
+            ]
+
+        return neighbours
+
+    def label_components(self, predicate: Callable[[T], bool], connectivity: int = 4) -> Components:
+        """
+        Label the connected regions of cells where predicate holds, 4 connected or 8 connected.
+        Every cell is labelled once, walking an adjacency built for predicate.
+
+        >>> grid = Grid.from_iterables(["##..#", "#.##.", "...#."])
+        >>> components = grid.label_components(lambda content: content == "#")
+        >>> components.labels.tolist()
+        [0, 0, -1, -1, 1, 0, -1, 2, 2, -1, -1, -1, -1, 2, -1]
+        >>> components.sizes, components.boxes[2]
+        ([3, 1, 3], (Position(x=2, y=1), Position(x=3, y=2)))
+        >>> components.positions(0)
+        [Position(x=0, y=0), Position(x=1, y=0), Position(x=0, y=1)]
+        >>> len(grid.label_components(lambda content: content == "#", connectivity=8))
+        1
+        >>> len(grid.label_components(lambda content: content == "."))
+        3
+        """
+        adjacency = self.adjacency(_connectivity_directions(connectivity), predicate)
+        labels = array("i", [NO_COMPONENT]) * (self.width * self.height)
+        sizes, boxes = [], []
+        for cell_id, content in enumerate(chain.from_iterable(self.rows())):
+            if labels[cell_id] == NO_COMPONENT and predicate(content):
+                size, box = self._fill_component(adjacency.neighbours, labels, cell_id, len(sizes))
+                sizes.append(size)
+                boxes.append(box)
+        return Components(self.width, labels, sizes, boxes)
+
+    def flood_fill(self, start: Position, predicate: Callable[[T], bool], connectivity: int = 4) -> Components:
+        """
+        The single region around start where predicate holds, empty when it doesn't hold at start.
+        Only cells reached from start are looked at.
+
+        >>> grid = Grid.from_iterables(["..#", "#.#", "..#"])
+        >>> region = grid.flood_fill(Position(0, 0), lambda content: content == ".")
+        >>> region.sizes, region.boxes, region.label(Position(0, 2)), region.label(Position(0, 1))
+        ([5], [(Position(x=0, y=0), Position(x=1, y=2))], 0, None)
+        >>> len(grid.flood_fill(Position(2, 0), lambda content: content == "."))
+        0
+        >>> region.label(Position(3, 0))
+        Traceback (most recent call last):
+        ...
+        lib.grid.BoundsError: Position Position(x=3, y=0) is outside the grid
+        """
+        start = self._tile_position(start)
+        labels = array("i", [NO_COMPONENT]) * (self.width * self.height)
+        if not predicate(self.contents[self.index(start)]):
+            return Components(self.width, labels, [], [])
+        neighbours = self.neighbour_function(_connectivity_directions(connectivity), predicate)
+        size, box = self._fill_component(neighbours, labels, start.y * self.width + start.x, 0)
+        return Components(self.width, labels, [size], [box])
+
+    def _fill_component(
+            self,
+            neighbours: Callable[[int], Sequence[int]],
+            labels: array,
+            seed: int,
+            label: int,
+    ) -> tuple[int, tuple[Position, Position]]:
+        """Label every cell reachable from seed, returning the region's size and bounding box"""
+        width = self.width
+        min_x, min_y, max_x, max_y = width, self.height, -1, -1
+        labels[seed] = label
+        stack, size = [seed], 0
+        while stack:
+            cell_id = stack.pop()
+            size += 1
+            y, x = divmod(cell_id, width)
+            if x < min_x:
+                min_x = x
+            if x > max_x:
+                max_x = x
+            if y < min_y:
+                min_y = y
+            if y > max_y:
+                max_y = y
+            for neighbour in neighbours(cell_id):
+                if labels[neighbour] == NO_COMPONENT:
+                    labels[neighbour] = label
+                    stack.append(neighbour)
+        return size, (Position(min_x, min_y), Position(max_x, max_y))
+
+    @property
+    def is_text(self) -> bool:
+        """Whether slicing the contents gives str, as needed for lines and find_all"""
+        return isinstance(self.contents, (str, MappedText))
+
+    @cached_property
+    def _line_cache(self) -> dict[Direction, list[Line]]:
+        return {}
+
+    def lines(self, direction: Direction) -> list[Line]:
+        """
+        Every full line of a text grid read in direction, computed once per direction
+
+        >>> grid = Grid.from_iterables(["AB", "CD"])
+        >>> [line.text for line in grid.lines(Direction.E)]
+        ['AB', 'CD']
+        >>> [line.text for line in grid.lines(Direction.N)]
+        ['CA', 'DB']
+        >>> [(line.text, line.start) for line in grid.lines(Direction.NE)]
+        [('A', Position(x=0, y=0)), ('CB', Position(x=0, y=1)), ('D', Position(x=1, y=1))]
+        >>> grid.lines(Direction.NE)[1].position(1)
+        Position(x=1, y=0)
+        """
+        if self.wrap:
+            raise ValueError("Lines of a wrapping grid never end")
+        self._forget_stale_caches()
+        if direction not in self._line_cache:
+            starts = set()
+            if direction.dx:
+                x = 0 if direction.dx > 0 else self.width - 1
+                starts |= {(x, y) for y in range(self.height)}
+            if direction.dy:
+                y = 0 if direction.dy > 0 else self.height - 1
+                starts |= {(x, y) for x in range(self.width)}
+            lines = []
+            for x, y in sorted(starts, key=lambda start: (start[1], start[0])):
+                start = Position(x, y)
+                length = self.ray_length(start, direction)
+                lines.append(Line(self._word(self.index(start), direction, length), start, direction))
+            self._line_cache[direction] = lines
+        return self._line_cache[direction]
+
+    @property
+    def bitboard_stride(self) -> int:
+        """Bits per row of a bitboard, one more than the width so rows are kept apart by a clear bit"""
+        return self.width + 1
+
+    @cached_property
+    def bitboard_mask(self) -> int:
+        """
+        >>> bin(Grid.from_iterables(["AB", "CD"]).bitboard_mask)
+        '0b11011'
+        """
+        return int(("0" + "1" * self.width) * self.height, 2)
+
+    @cached_property
+    def _bitboard_cache(self) -> dict[T, int]:
+        return {}
+
+    def bitboard(self, predicate_or_char: T | Callable[[T], bool]) -> int:
+        """
+        A bitset of the cells holding the char or matching the predicate, bit y * bitboard_stride + x for (x, y)
+
+        >>> grid = Grid.from_iterables(["#..", "..#", "#.."])
+        >>> bin(grid.bitboard("#"))
+        '0b101000001'
+        >>> walls = grid.bitboard("#")
+        >>> open_cells = grid.bitboard(lambda content: content != "#")
+        >>> reached = grid.bitboard_from_positions([Position(1, 0)])
+        >>> for _ in range(2):
+        ...     reached |= open_cells & grid.spread_bitboard(reached, [Direction.N, Direction.E, Direction.S, Direction.W])
+        >>> grid.bitboard_positions(reached)
+        [Position(x=1, y=0), Position(x=2, y=0), Position(x=0, y=1), Position(x=1, y=1), Position(x=1, y=2)]
+        """
+        if callable(predicate_or_char):
+            return self._build_bitboard(predicate_or_char)
+        self._forget_stale_caches()
+        if predicate_or_char not in self._bitboard_cache:
+            self._bitboard_cache[predicate_or_char] = self._build_bitboard(lambda content: content == predicate_or_char)
+        return self._bitboard_cache[predicate_or_char]
+
+    def _build_bitboard(self, predicate: Callable[[T], bool]) -> int:
+        if self.is_text:
+            chars = set().union(*map(set, self.rows()))
+            table = str.maketrans({char: "1" if predicate(char) else "0" for char in chars})
+            bits = "0".join(row.translate(table) for row in self.rows())
+        else:
+            bits = "0".join("".join("1" if predicate(content) else "0" for content in row) for row in self.rows())
+        # Bit 0 is the first cell, so the most significant digit comes last
+        return int(bits[::-1] or "0", 2)
+
+    def bitboard_from_positions(self, positions: Iterable[Position]) -> int:
+        board = 0
+        for position in map(self._tile_position, positions):
+            board |= 1 << (position.y * self.bitboard_stride + position.x)
+        return board
+
+    def bitboard_positions(self, board: int) -> list[Position]:
+        bits = bin(board)[:1:-1]
+        stride = self.bitboard_stride
+        return [Position(index % stride, index // stride) for index in _occurrences(bits, "1")]
+
+    def shift_bitboard(self, board: int, direction: Direction, length: int = 1) -> int:
+        """
+        Set each cell's bit when the cell length steps away in direction is set
+
+        >>> grid = Grid.from_iterables(["AB", "CD"])
+        >>> grid.bitboard_positions(grid.shift_bitboard(grid.bitboard("D"), Direction.SE))
+        [Position(x=0, y=0)]
+        >>> grid.shift_bitboard(grid.bitboard("B"), Direction.W)
+        0
+        >>> grid = Grid.from_iterables(["ABC", "DEF"])
+        >>> grid.shift_bitboard(grid.bitboard("D"), Direction.E, 2), grid.shift_bitboard(grid.bitboard("C"), Direction.W, 2)
+        (0, 0)
+        >>> grid.tiled().spread_bitboard(grid.bitboard("C"), [Direction.E])
+        Traceback (most recent call last):
+        ...
+        ValueError: Bitboards stop at the edges, they can't be shifted across a wrapping grid
+        """
+        if self.wrap:
+            raise ValueError("Bitboards stop at the edges, they can't be shifted across a wrapping grid")
+        # One step at a time, the clear bit between rows only stops a single step from wrapping
+        shift = direction.dy * self.bitboard_stride + direction.dx
+        for _ in range(length):
+            board = (board >> shift if shift >= 0 else board << -shift) & self.bitboard_mask
+        return board
+
+    def spread_bitboard(self, board: int, directions: Iterable[Direction]) -> int:
+        """Move every set bit one step in each of directions"""
+        spread = 0
+        for direction in directions:
+            spread |= self.shift_bitboard(board, direction.opposite)
+        return spread
+
+    def find_all(self, word: str) -> list[tuple[Position, Direction]]:
+        """
+        The start position and direction of every occurrence of word in a text grid
+
+        >>> grid = Grid.from_iterables(["XMAS", "MM..", "AAA.", "S..S"])
+        >>> [(position, direction.name) for position, direction in grid.find_all("XMAS")]
+        [(Position(x=0, y=0), 'E'), (Position(x=0, y=0), 'SE'), (Position(x=0, y=0), 'S')]
+        >>> [(position, direction.name) for position, direction in grid.find_all("AA")]
+        [(Position(x=0, y=2), 'E'), (Position(x=1, y=2), 'E'), (Position(x=2, y=2), 'W'), (Position(x=1, y=2), 'W')]
+        >>> grid.tiled().find_all("AB")
+        Traceback (most recent call last):
+        ...
+        ValueError: Lines of a wrapping grid never end
+        """
+        return [
+            (line.position(index), direction)
+            for direction in Direction
+            for line in self.lines(direction)
+            for index in _occurrences(line.text, word)
+        ]
+
+    def ray_length(self, position: Position, direction: Direction) -> int:
+        """
+        >>> grid = Grid.from_iterables(alpha_iterables)
+        >>> grid.ray_length(Position(1,3), Direction.SE)
+        2
+        >>> grid.ray_length(Position(5,0), Direction.W)
+        0
+        """
+        if not (0 <= position.x < self.width and 0 <= position.y < self.height):
+            return 0
+        unbounded = max(self.width, self.height)
+        return min(
+            ray_limit(position.x, direction.dx, self.width, unbounded),
+            ray_limit(position.y, direction.dy, self.height, unbounded),
+        )
 
     def words(self, position: Position, min_length: int, max_length: int | None = None) -> Generator[T, None, None]:
         """
@@ -116,23 +1120,214 @@ class Grid(Generic[T]):
         ['ABCDE', 'AGMPV', 'AFKMR']
         """
         max_length = min_length if max_length is None else max_length
-        for length in range(min_length, max_length + 1):
-            for direction in Direction:
-                try:
+        if self.wrap:
+            for length in range(min_length, max_length + 1):
+                for direction in Direction:
                     yield self.word(position, direction, length)
-                except BoundsError:
-                    pass
+            return
+        if not self.in_bounds(position):
+            return
+        index = self.index(position)
+        # How far each direction reaches from here, worked out once rather than per length
+        reaches = [(direction, self.ray_length(position, direction)) for direction in Direction]
+        for length in range(min_length, max_length + 1):
+            for direction, reach in reaches:
+                if length <= reach:
+                    yield self._word(index, direction, length)
+
+    def count_word(self, word: str, workers: int = 1) -> int:
+        """
+        Count every occurrence of word in all 8 directions, in horizontal bands over worker processes when workers > 1
+
+        >>> grid = Grid.from_iterables([
+        ...     "MMMSXXMASM", "MSAMXMSMSA", "AMXSXMAAMM", "MSAMASMSMX", "XMASAMXAMM",
+        ...     "XXAMMXXAMA", "SMSMSASXSS", "SAXAMASAAA", "MAMMMXMMMM", "MXMXAXMASX",
+        ... ])
+        >>> grid.count_word("XMAS")
+        18
+        >>> grid._count_word_bitboards("XMAS")
+        18
+        >>> grid.count_word("XMAS", workers=3)
+        18
+        >>> Grid.from_iterables(["AB"]).count_word("A")
+        8
+        >>> Grid.from_iterables(["AB"]).tiled().count_word("A")
+        Traceback (most recent call last):
+        ...
+        ValueError: A wrapping grid holds every word infinitely often
+        """
+        if self.wrap:
+            raise ValueError("A wrapping grid holds every word infinitely often")
+        if not word:
+            return 0
+        if workers > 1 and self.height > 1 and self.width:
+            return self._count_word_banded(word, workers)
+        if numpy is not None and word.isascii():
+            cells = self._numpy_cells()
+            if cells is not None:
+                return self._count_word_numpy(cells, word)
+        return self._count_word_bitboards(word)
+
+    def _count_word_banded(self, word: str, workers: int) -> int:
+        halo = len(word) - 1
+        band_height = -(-self.height // workers)
+        bands, halos = [], []
+        for top in range(0, self.height, band_height):
+            band_top = max(0, top - halo)
+            bottom = min(self.height, top + band_height)
+            bands.append(self.sub_grid(Position(0, band_top), Position(self.width, bottom - band_top)).copy())
+            halos.append(top - band_top)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return sum(executor.map(_count_band_word, bands, halos, repeat(word)))
+
+    def _count_word_bitboards(self, word: str) -> int:
+        boards = {char: self.bitboard(char) for char in set(word)}
+        count = 0
+        for direction in Direction:
+            # Cells where the rest of the word follows, built up from its last char
+            matches = boards[word[-1]]
+            for char in reversed(word[:-1]):
+                matches = boards[char] & self.shift_bitboard(matches, direction)
+            count += matches.bit_count()
+        return count
+
+    def _numpy_cells(self) -> "numpy.ndarray | None":
+        """
+        The grid as a (height, width) uint8 array sharing memory where it can, None for non ASCII contents.
+        Only the span the grid covers is read, so a small view of a large grid stays cheap.
+        """
+        span = (self.height - 1) * self.stride + self.width if self.height and self.width else 0
+        if isinstance(self.contents, MappedText):
+            contents = numpy.frombuffer(self.contents.mapped, dtype=numpy.uint8, count=span, offset=self.start)
+        elif isinstance(self.contents, str):
+            text = self.contents[self.start:self.start + span]
+            if not text.isascii():
+                return None
+            contents = numpy.frombuffer(text.encode(), dtype=numpy.uint8)
+        else:
+            return None
+        return numpy.lib.stride_tricks.as_strided(
+            contents, shape=(self.height, self.width), strides=(self.stride, 1), writeable=False,
+        )
+
+    def _count_word_numpy(self, cells: "numpy.ndarray", word: str) -> int:
+        reach = len(word) - 1
+        count = 0
+        for direction in Direction:
+            dx, dy = direction.value.x, direction.value.y
+            min_x, max_x = max(0, -dx * reach), min(self.width, self.width - dx * reach)
+            min_y, max_y = max(0, -dy * reach), min(self.height, self.height - dy * reach)
+            if min_x >= max_x or min_y >= max_y:
+                continue
+            matches = numpy.ones((max_y - min_y, max_x - min_x), dtype=bool)
+            for i, char in enumerate(word.encode()):
+                matches &= cells[min_y + i * dy:max_y + i * dy, min_x + i * dx:max_x + i * dx] == char
+            count += int(numpy.count_nonzero(matches))
+        return count
+
+    def match_pattern(
+            self,
+            pattern: Sequence[str],
+            wildcard: str = ".",
+            rotations: bool = False,
+            reflections: bool = False,
+    ) -> list[Position]:
+        """
+        Every position of the pattern's top left corner where all its non wildcard cells match
+
+        >>> grid = Grid.from_iterables(["M.S..", ".A...", "M.S.S", "XS.A.", "SXM.M"])
+        >>> grid.match_pattern(["M.S", ".A.", "M.S"])
+        [Position(x=0, y=0)]
+        >>> grid.match_pattern(["M.S", ".A.", "M.S"], rotations=True)
+        [Position(x=0, y=0), Position(x=2, y=2)]
+        >>> grid._match_pattern_python(("S.S", ".A.", "M.M"), ".")
+        {(2, 2)}
+        >>> grid.match_pattern(["SX"], reflections=True)
+        [Position(x=0, y=3), Position(x=0, y=4)]
+        """
+        if self.wrap:
+            raise ValueError("A wrapping grid matches every pattern infinitely often")
+        variants = {tuple(pattern)}
+        if reflections:
+            variants |= {tuple(row[::-1] for row in variant) for variant in variants}
+            variants |= {variant[::-1] for variant in variants}
+        if rotations:
+            for _ in range(3):
+                variants |= {_rotate(variant) for variant in variants}
+        anchors = set()
+        for variant in variants:
+            if len({len(row) for row in variant}) > 1:
+                raise ValueError(f"Pattern rows have different lengths: {variant}")
+            cells = self._numpy_cells() if numpy is not None and "".join(variant).isascii() else None
+            if cells is None:
+                anchors |= self._match_pattern_python(variant, wildcard)
+            else:
+                anchors |= self._match_pattern_numpy(cells, variant, wildcard)
+        return [Position(x, y) for y, x in sorted((y, x) for x, y in anchors)]
+
+    def _match_pattern_python(self, pattern: Sequence[str], wildcard: str) -> set[tuple[int, int]]:
+        checks = [(x, y, char) for y, row in enumerate(pattern) for x, char in enumerate(row) if char != wildcard]
+        max_x, max_y = self.width - len(pattern[0]), self.height - len(pattern)
+        if not checks:
+            return {(x, y) for y in range(max_y + 1) for x in range(max_x + 1)}
+        # Only windows holding the rarest character of the pattern in the right place can match
+        anchor_x, anchor_y, anchor_char = min(checks, key=lambda check: self.count_of(check[2]))
+        offsets = [(y * self.stride + x, char) for x, y, char in checks]
+        contents = self.contents
+        anchors = set()
+        for local_index in self.content_index.get(anchor_char, ()):
+            y, x = divmod(local_index, self.width)
+            x, y = x - anchor_x, y - anchor_y
+            if 0 <= x <= max_x and 0 <= y <= max_y:
+                start = self.start + y * self.stride + x
+                if all(contents[start + offset] == char for offset, char in offsets):
+                    anchors.add((x, y))
+        return anchors
+
+    def _match_pattern_numpy(self, cells: "numpy.ndarray", pattern: Sequence[str], wildcard: str) -> set[tuple[int, int]]:
+        height, width = self.height - len(pattern) + 1, self.width - len(pattern[0]) + 1
+        if height <= 0 or width <= 0:
+            return set()
+        matches = numpy.ones((height, width), dtype=bool)
+        for y, row in enumerate(pattern):
+            for x, char in enumerate(row):
+                if char != wildcard:
+                    matches &= cells[y:y + height, x:x + width] == ord(char)
+        ys, xs = numpy.nonzero(matches)
+        return set(zip(xs.tolist(), ys.tolist()))
 
     def word(self, position: Position, direction: Direction, length: int) -> T:
         """
         >>> grid = Grid.from_iterables(alpha_iterables)
         >>> grid.word(Position(2,2), Direction.SE, 2)
         'MP'
+        >>> grid.tiled().word(Position(3,4), Direction.SE, 4)
+        'UEFL'
+        >>> column = Grid.from_iterables(["A", "B"])
+        >>> column.word(Position(0,1), Direction.NE, 1), len(list(column.words(Position(0,0), 1)))
+        ('B', 8)
         """
-        content = [
-            self.offset(position, direction, i).content
-            for i in range(length)
-        ]
+        if self.wrap:
+            content = [self.offset(position, direction, i).content for i in range(length)]
+            if self.is_text:
+                return "".join(content)
+            return reduce(operator.add, content)
+        if length > self.ray_length(position, direction):
+            raise BoundsError(f"Position {position.offset(direction, length - 1)} is outside the grid")
+        return self._word(self.index(position), direction, length)
+
+    def _word(self, index: int, direction: Direction, length: int) -> T:
+        step = direction.dy * self.stride + direction.dx
+        if not step:
+            # A diagonal of a one cell wide grid, which is never longer than one cell
+            step = 1
+        stop = index + step * length
+        content = self.contents[index:stop if stop >= 0 else None:step]
+        if isinstance(content, str):
+            return content
+        if isinstance(content, array):
+            # Typed numeric contents, sum adds the machine ints without dispatching to __add__
+            return sum(content)
         word = reduce(operator.add, content)
         return word
 
@@ -145,10 +1340,13 @@ class Grid(Generic[T]):
         >>> cell.content
         'C'
         """
-        new_position = position.offset(direction, length)
-        if not self.in_bounds(new_position):
-            raise BoundsError(f"Position {new_position} is outside the grid")
-        return self.at(new_position)
+        x = position.x + length * direction.dx
+        y = position.y + length * direction.dy
+        if self.wrap:
+            return self.at(Position(x, y))
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise BoundsError(f"Position {Position(x, y)} is outside the grid")
+        return Cell(Position(x, y), self.contents[self.start + y * self.stride + x])
 
     def at(self, position: Position) -> Cell[T]:
         """
@@ -160,8 +1358,93 @@ class Grid(Generic[T]):
         'A'
         >>> grid.at(Position(2,1)).content
         'H'
+        >>> grid.tiled().at(Position(-1,12))
+        TiledCell(position=Position(x=4, y=2), content='O', tile=Position(x=-1, y=2))
         """
-        if not self.in_bounds(position):
+        x, y = position.x, position.y
+        if self.wrap:
+            tile_y, y = divmod(y, self.height)
+            tile_x, x = divmod(x, self.width)
+            return TiledCell(Position(x, y), self.contents[self.start + y * self.stride + x], Position(tile_x, tile_y))
+        if not (0 <= x < self.width and 0 <= y < self.height):
             raise BoundsError(f"Position {position} is outside the grid")
-        cell = self.cells[position.y][position.x]
+        cell = Cell(position, self.contents[self.start + y * self.stride + x])
         return cell
+
+
+def _count_band_word(band: Grid[str], halo: int, word: str) -> int:
+    """
+    Count the matches whose lowest row is below the halo rows, those within the halo belong to the band above.
+    A match spans at most len(word) rows, so none reaches above a halo of len(word) - 1 rows.
+
+    >>> band = Grid.from_iterables(["XMAS", "M...", "A...", "S..."])
+    >>> _count_band_word(band, 0, "XMAS")
+    2
+    >>> _count_band_word(band, 1, "XMAS")
+    1
+    """
+    count = band.count_word(word)
+    if halo:
+        count -= band.sub_grid(Position(0, 0), Position(band.width, halo)).count_word(word)
+    return count
+
+
+def _connectivity_directions(connectivity: int) -> Sequence[Direction]:
+    if connectivity == 4:
+        return CARDINALS
+    if connectivity == 8:
+        return tuple(Direction)
+    raise ValueError(f"Connectivity must be 4 or 8, not {connectivity}")
+
+
+def _occurrences(text: str, word: str) -> list[int]:
+    """
+    Start of every occurrence, overlapping ones included
+
+    >>> _occurrences("AAAB", "AA")
+    [0, 1]
+    """
+    indexes = []
+    index = text.find(word)
+    while index != -1:
+        indexes.append(index)
+        index = text.find(word, index + 1)
+    return indexes
+
+
+def _rotate(pattern: tuple[str, ...]) -> tuple[str, ...]:
+    """
+    A quarter turn clockwise
+
+    >>> _rotate(("AB", "CD", "EF"))
+    ('ECA', 'FDB')
+    """
+    return tuple("".join(row[x] for row in reversed(pattern)) for x in range(len(pattern[0])))
+
+
+def ray_limit(coordinate: int, delta: int, size: int, unbounded: int) -> int:
+    """
+    Cells from coordinate to the edge of size moving by delta along one axis, unbounded when delta is 0
+
+    >>> ray_limit(1, 1, 5, 9), ray_limit(1, -1, 5, 9), ray_limit(1, 0, 5, 9)
+    (4, 2, 9)
+    """
+    if delta > 0:
+        return size - coordinate
+    if delta < 0:
+        return coordinate + 1
+    return unbounded
+
+
+def _join(like: Sequence[T], rows: Iterable[Sequence[T]]) -> Sequence[T]:
+    """Concatenate rows into flat contents of the same kind as `like`"""
+    if isinstance(like, RowContents):
+        return _join(like.rows[0], rows)
+    if isinstance(like, (str, MappedText)):
+        return "".join(rows)
+    if isinstance(like, array):
+        contents = array(like.typecode)
+        for row in rows:
+            contents.extend(row)
+        return contents
+    return list(chain.from_iterable(rows))
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Generic, Iterable, Sequence
+
+from lib.grid import CARDINALS, Adjacency, BoundsError, Direction, Grid, Position, T
+
+UNREACHED = -1
+NO_PREVIOUS = -1
+
+
+def unit_cost(content) -> int:
+    return 1
+
+
+@dataclass
+class SearchResult(Generic[T]):
+    """
+    Distances and the previous cell on a shortest path, for every cell id y * width + x.
+    Cells that weren't reached hold UNREACHED and NO_PREVIOUS.
+    """
+    grid: Grid[T]
+    distances: array
+    previous: array
+
+    def distance(self, position: Position) -> int | None:
+        distance = self.distances[_cell_id(self.grid, position)]
+        return None if distance == UNREACHED else distance
+
+    def path(self, position: Position) -> list[Position]:
+        """From a source to position, both included, empty when position wasn't reached"""
+        cell_id = _cell_id(self.grid, position)
+        if self.distances[cell_id] == UNREACHED:
+            return []
+        path = []
+        while cell_id != NO_PREVIOUS:
+            path.append(_position(self.grid, cell_id))
+            cell_id = self.previous[cell_id]
+        return path[::-1]
+
+    def reached(self) -> list[Position]:
+        return [_position(self.grid, cell_id) for cell_id, distance in enumerate(self.distances) if distance != UNREACHED]
+
+
+def bfs(
+        grid: Grid[T],
+        sources: Iterable[Position],
+        passable: Callable[[T], bool] | None = None,
+        directions: Sequence[Direction] = CARDINALS,
+        target: Position | None = None,
+        adjacency: Adjacency | None = None,
+) -> SearchResult[T]:
+    """
+    Breadth first search from every source at once, stopping early once target is reached.
+    Neighbours are worked out as cells are reached, unless an adjacency from grid.adjacency()
+    is passed, which repeated searches over the same grid can share.
+
+    >>> grid = Grid.from_iterables(["..#.", ".##.", "...."])
+    >>> result = bfs(grid, [Position(0, 0)], passable=lambda content: content != "#")
+    >>> result.distance(Position(3, 0))
+    7
+    >>> result.path(Position(3, 1))
+    [Position(x=0, y=0), Position(x=0, y=1), Position(x=0, y=2), Position(x=1, y=2), Position(x=2, y=2), Position(x=3, y=2), Position(x=3, y=1)]
+    >>> bfs(grid, [Position(0, 0), Position(3, 0)], passable=lambda content: content != "#").distance(Position(3, 2))
+    2
+    >>> bfs(grid, [Position(4, 0)])
+    Traceback (most recent call last):
+    ...
+    lib.grid.BoundsError: Position Position(x=4, y=0) is outside the grid
+    """
+    distances, previous = _buffers(grid)
+    queue = deque()
+    for source in sources:
+        cell_id = _cell_id(grid, source)
+        if distances[cell_id] == UNREACHED:
+            distances[cell_id] = 0
+            queue.append(cell_id)
+    target_id = None if target is None else _cell_id(grid, target)
+    neighbours = grid.neighbour_function(directions, passable, adjacency)
+    while queue:
+        cell_id = queue.popleft()
+        if cell_id == target_id:
+            break
+        distance = distances[cell_id] + 1
+        for neighbour in neighbours(cell_id):
+            if distances[neighbour] == UNREACHED:
+                distances[neighbour] = distance
+                previous[neighbour] = cell_id
+                queue.append(neighbour)
+    return SearchResult(grid, distances, previous)
+
+
+def dijkstra(
+        grid: Grid[T],
+        sources: Iterable[Position],
+        cost: Callable[[T], int] = unit_cost,
+        passable: Callable[[T], bool] | None = None,
+        directions: Sequence[Direction] = CARDINALS,
+        target: Position | None = None,
+        adjacency: Adjacency | None = None,
+) -> SearchResult[T]:
+    """
+    Cheapest paths where entering a cell costs cost(content), a non negative int
+
+    >>> grid = Grid.from_digits(["131", "191", "111"])
+    >>> result = dijkstra(grid, [Position(0, 0)], cost=lambda content: content)
+    >>> result.distance(Position(2, 2))
+    4
+    >>> result.distance(Position(2, 0))
+    4
+    """
+    return _best_first(grid, sources, cost, passable, directions, target, None, adjacency)
+
+
+def astar(
+        grid: Grid[T],
+        start: Position,
+        goal: Position,
+        cost: Callable[[T], int] = unit_cost,
+        passable: Callable[[T], bool] | None = None,
+        directions: Sequence[Direction] = CARDINALS,
+        heuristic: Callable[[Position, Position], int] | None = None,
+        adjacency: Adjacency | None = None,
+) -> list[Position]:
+    """
+    A shortest path from start to goal, empty when there's none.
+    The default heuristic assumes every step costs at least 1.
+
+    >>> grid = Grid.from_iterables(["..#.", ".##.", "...."])
+    >>> len(astar(grid, Position(0, 0), Position(3, 0), passable=lambda content: content != "#")) - 1
+    7
+    >>> astar(grid, Position(0, 0), Position(3, 0), passable=lambda content: content == ".", directions=list(Direction))
+    [Position(x=0, y=0), Position(x=0, y=1), Position(x=1, y=2), Position(x=2, y=2), Position(x=3, y=1), Position(x=3, y=0)]
+    """
+    if heuristic is None:
+        heuristic = manhattan if all(direction in CARDINALS for direction in directions) else chebyshev
+    result = _best_first(grid, [start], cost, passable, directions, goal, heuristic, adjacency)
+    return result.path(goal)
+
+
+def manhattan(a: Position, b: Position) -> int:
+    return abs(a.x - b.x) + abs(a.y - b.y)
+
+
+def chebyshev(a: Position, b: Position) -> int:
+    return max(abs(a.x - b.x), abs(a.y - b.y))
+
+
+def _best_first(
+        grid: Grid[T],
+        sources: Iterable[Position],
+        cost: Callable[[T], int],
+        passable: Callable[[T], bool] | None,
+        directions: Sequence[Direction],
+        target: Position | None,
+        heuristic: Callable[[Position, Position], int] | None,
+        adjacency: Adjacency | None,
+) -> SearchResult[T]:
+    distances, previous = _buffers(grid)
+    heap = []
+    for source in sources:
+        cell_id = _cell_id(grid, source)
+        distances[cell_id] = 0
+        heap.append((heuristic(source, target) if heuristic else 0, cell_id))
+    heapq.heapify(heap)
+    done = bytearray(grid.width * grid.height)
+    target_id = None if target is None else _cell_id(grid, target)
+    contents = _content_getter(grid)
+    neighbours = grid.neighbour_function(directions, passable, adjacency)
+    while heap:
+        _, cell_id = heapq.heappop(heap)
+        if done[cell_id]:
+            continue
+        done[cell_id] = 1
+        if cell_id == target_id:
+            break
+        for neighbour in neighbours(cell_id):
+            if done[neighbour]:
+                continue
+            distance = distances[cell_id] + cost(contents(neighbour))
+            if distances[neighbour] == UNREACHED or distance < distances[neighbour]:
+                distances[neighbour] = distance
+                previous[neighbour] = cell_id
+                estimate = distance + heuristic(_position(grid, neighbour), target) if heuristic else distance
+                heapq.heappush(heap, (estimate, neighbour))
+    return SearchResult(grid, distances, previous)
+
+
+def _buffers(grid: Grid) -> tuple[array, array]:
+    size = grid.width * grid.height
+    return array("q", [UNREACHED]) * size, array("q", [NO_PREVIOUS]) * size
+
+
+def _cell_id(grid: Grid, position: Position) -> int:
+    if grid.wrap:
+        # Every tile of a wrapping grid shares the cells of the first
+        return position.y % grid.height * grid.width + position.x % grid.width
+    if not grid.in_bounds(position):
+        raise BoundsError(f"Position {position} is outside the grid")
+    return position.y * grid.width + position.x
+
+
+def _position(grid: Grid, cell_id: int) -> Position:
+    y, x = divmod(cell_id, grid.width)
+    return Position(x, y)
+
+
+def _content_getter(grid: Grid[T]) -> Callable[[int], T]:
+    contents, start, stride, width = grid.contents, grid.start, grid.stride, grid.width
+    if stride == width:
+        return lambda cell_id: contents[start + cell_id]
+    return lambda cell_id: contents[start + cell_id // width * stride + cell_id % width]